@@ -1,19 +1,153 @@
 import os
 import json
+import hashlib
+import mmap
 import tempfile
 import subprocess
 import shutil
 import stat
+import atexit
+import multiprocessing
+import threading
 from pathlib import Path
-from typing import Dict, List, Any, Optional
-import git
+from typing import Dict, List, Any, Optional, Iterable, Iterator, Tuple
 from fastmcp import FastMCP
 from datetime import datetime
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter, OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache, update_wrapper, wraps
+from itertools import repeat
+from operator import itemgetter
 import re
+import html
+import string
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+try:
+    import re2
+except ImportError:
+    re2 = None
 
 # Initialize MCP server
 mcp = FastMCP("Code Analysis Server")
 
+# Secret detection patterns as (group name, pattern, secret type), ordered most
+# specific first so a long secret_key is reported as a Private Key, not an API key
+_NAMED_SECRET_PATTERNS = [
+    ('private_key', r'(private[_-]?key|secret[_-]?key)[^\S\n]*[:=][^\S\n]*["\']?([A-Za-z0-9+/=]{100,})["\']?', 'Private Key'),
+    ('aws', r'aws[_-]?access[_-]?key[_-]?id[^\S\n]*[:=][^\S\n]*["\']?([A-Z0-9]{20})["\']?', 'AWS Access Key'),
+    ('github', r'github[_-]?token[^\S\n]*[:=][^\S\n]*["\']?([a-zA-Z0-9_]{40})["\']?', 'GitHub Token'),
+    ('slack', r'slack[_-]?token[^\S\n]*[:=][^\S\n]*["\']?(xox[a-zA-Z]-[a-zA-Z0-9-]+)["\']?', 'Slack Token'),
+    ('discord', r'discord[_-]?token[^\S\n]*[:=][^\S\n]*["\']?([A-Za-z0-9_-]{24}\.[A-Za-z0-9_-]{6}\.[A-Za-z0-9_-]{27})["\']?', 'Discord Token'),
+    ('jwt', r'jwt[_-]?token[^\S\n]*[:=][^\S\n]*["\']?([A-Za-z0-9-_=]+\.[A-Za-z0-9-_=]+\.?[A-Za-z0-9-_.+/=]*)["\']?', 'JWT Token'),
+    ('api_key', r'(api[_-]?key|secret[_-]?key|access[_-]?token)[^\S\n]*[:=][^\S\n]*["\']?([a-zA-Z0-9_-]{20,})["\']?', 'API Key/Secret'),
+    ('password', r'(password|passwd|pwd)[^\S\n]*[:=][^\S\n]*["\']?([^\s"\']{8,})["\']?', 'Password'),
+    ('uuid', r'(?-i:["\']?[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}["\']?)', 'UUID/Token')
+]
+
+# All secret patterns fused into a single bytes alternation so each file is scanned
+# once without decoding it; whitespace classes exclude newlines to keep matches on one line
+_COMBINED_SECRETS_RE_B = re.compile(
+    '|'.join(f'(?P<{name}>{pattern})' for name, pattern, _ in _NAMED_SECRET_PATTERNS).encode(),
+    re.IGNORECASE
+)
+_NEWLINE_RE_B = re.compile(rb'\n')
+# Cheap prefilter: every secret pattern needs one of these keywords, or a UUID's
+# dash-delimited hex block, on its line. This is the only pass over the whole file, so it
+# runs on RE2's linear-time DFA when google-re2 is installed
+_SECRET_TRIGGER_PATTERN_B = rb'key|token|secret|passw|pwd|(?-i:-[0-9a-f]{4}-)'
+_SECRET_TRIGGER_RE_B = (re2.compile(rb'(?i)' + _SECRET_TRIGGER_PATTERN_B) if re2 is not None
+                        else re.compile(_SECRET_TRIGGER_PATTERN_B, re.IGNORECASE))
+_SECRET_TYPES = {name: secret_type for name, _, secret_type in _NAMED_SECRET_PATTERNS}
+# Group holding the secret value in each alternative: its last capture, or the whole match
+_SECRET_VALUE_GROUPS = {
+    name: _COMBINED_SECRETS_RE_B.groupindex[name] + re.compile(pattern).groups
+    for name, pattern, _ in _NAMED_SECRET_PATTERNS
+}
+_HIGH_SEVERITY_SECRETS = frozenset({'private_key', 'aws', 'github'})
+
+_SECRET_EXTENSIONS = frozenset({'.py', '.js', '.java', '.go', '.rs', '.env', '.config', '.yml', '.yaml', '.json', '.xml'})
+
+# Directories pruned from every repository walk
+_SKIP_DIRS = frozenset({'.git', '__pycache__', 'node_modules', '.venv', 'venv', 'dist', 'build', '.tox', '.mypy_cache'})
+
+def _git_ignored_dirs(repo_path: str) -> frozenset:
+    """Paths of directories git itself ignores in the work tree; empty outside a git repository"""
+    try:
+        result = subprocess.run([
+            'git', '-C', repo_path, 'ls-files', '--others', '--ignored', '--exclude-standard', '--directory', '-z'
+        ], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=60)
+    except (OSError, subprocess.TimeoutExpired):
+        return frozenset()
+    if result.returncode != 0:
+        return frozenset()
+    # --directory reports a wholly ignored directory once, with a trailing slash
+    return frozenset(
+        os.path.join(repo_path, *rel_path.rstrip('/').split('/'))
+        for rel_path in result.stdout.decode('utf-8', errors='surrogateescape').split('\0')
+        if rel_path.endswith('/')
+    )
+
+def _unmodified_file_keys(repo_path: str) -> Dict[str, str]:
+    """Map each tracked file whose working copy matches the index to its git blob id and path"""
+    try:
+        staged = subprocess.run(['git', '-C', repo_path, 'ls-files', '--stage', '-z'],
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=60)
+        modified = subprocess.run(['git', '-C', repo_path, 'ls-files', '--modified', '-z'],
+                                  stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=60)
+    except (OSError, subprocess.TimeoutExpired):
+        return {}
+    if staged.returncode != 0 or modified.returncode != 0:
+        return {}
+    changed = set(modified.stdout.decode('utf-8', errors='surrogateescape').split('\0'))
+    file_keys = {}
+    # Each record is "<mode> <blob id> <stage>\t<path>"; the blob id already hashes the content
+    for record in staged.stdout.decode('utf-8', errors='surrogateescape').split('\0'):
+        info, _, rel_path = record.partition('\t')
+        if rel_path and rel_path not in changed:
+            file_keys[os.path.join(repo_path, *rel_path.split('/'))] = f'{info.split()[1]}:{rel_path}'
+    return file_keys
+
+def _walk_source_files(repo_path: str, skip_dirs: frozenset = _SKIP_DIRS,
+                       skip_paths: frozenset = frozenset()) -> Iterator[Tuple[os.DirEntry, str]]:
+    """Walk the repository once with os.scandir, yielding (entry, lowercase extension) per file"""
+    stack = [repo_path]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    # DirEntry caches the type from the directory listing, so no extra stat here.
+                    # Symlinks are never followed: no loops, and no reads outside the checkout
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in skip_dirs and entry.path not in skip_paths:
+                            stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        name = entry.name
+                        dot = name.rfind('.')
+                        yield entry, name[dot:].lower() if dot > 0 else ''
+        except OSError:
+            continue
+
+_EXT_TO_LANG = {
+    '.py': 'python',
+    '.js': 'javascript', '.jsx': 'javascript', '.ts': 'javascript', '.tsx': 'javascript',
+    '.java': 'java',
+    '.go': 'go',
+    '.rs': 'rust',
+    '.cpp': 'cpp', '.c': 'cpp', '.h': 'cpp', '.hpp': 'cpp',
+    '.cs': 'csharp',
+    '.rb': 'ruby',
+    '.php': 'php'
+}
+
 class LanguageDetector:
     LANGUAGE_TOOLS = {
         'python': {
@@ -49,89 +183,164 @@ class LanguageDetector:
     }
 
     @staticmethod
-    def detect_languages(repo_path: str) -> Dict[str, int]:
+    def detect_languages(repo_path: str, files: Optional[Iterable[Tuple[os.DirEntry, str]]] = None) -> Dict[str, int]:
         """Detect programming languages in repository"""
-        language_counts = {}
-        
-        extensions_map = {
-            '.py': 'python',
-            '.js': 'javascript', '.jsx': 'javascript', '.ts': 'javascript', '.tsx': 'javascript',
-            '.java': 'java',
-            '.go': 'go',
-            '.rs': 'rust',
-            '.cpp': 'cpp', '.c': 'cpp', '.h': 'cpp', '.hpp': 'cpp',
-            '.cs': 'csharp',
-            '.rb': 'ruby',
-            '.php': 'php'
-        }
-        
-        for file_path in Path(repo_path).rglob("*"):
-            if file_path.is_file() and not any(ignore in str(file_path) for ignore in ['.git', '__pycache__', 'node_modules']):
-                ext = file_path.suffix.lower()
-                if ext in extensions_map:
-                    lang = extensions_map[ext]
-                    language_counts[lang] = language_counts.get(lang, 0) + 1
-        
-        return language_counts
+        files = files if files is not None else _walk_source_files(repo_path)
+        # One C-level dict.get per file; unknown extensions map to None and are dropped
+        return dict(Counter(filter(None, map(_EXT_TO_LANG.get, map(itemgetter(1), files)))))
+
+def _primary_language(languages: Dict[str, int], default: str) -> str:
+    """Most common detected language, ties going to the first detected"""
+    top = Counter(languages).most_common(1)
+    return top[0][0] if top else default
+
+# Minimum number of candidate files before secret scanning uses a process pool
+_PARALLEL_SCAN_MIN_FILES = 128
+# Scans start from worker threads (tool executors, asyncio.to_thread, Streamlit script threads),
+# and a forked child of a multithreaded process can deadlock on a lock another thread held.
+# Pool workers are therefore started from a clean forkserver, or spawned where that is unavailable
+_SCAN_MP_CONTEXT = multiprocessing.get_context(
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+)
+# Cap on detailed findings kept in memory, and the HIGH-severity count past which scanning stops
+_MAX_SECRET_FINDINGS = 500
+_SECRET_SATURATION_HIGH_COUNT = 6
+# Findings of previously scanned file versions, so unchanged files are not read again on re-analysis
+_SECRET_SCAN_CACHE_SIZE = 100_000
+_secret_scan_cache: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+_secret_scan_cache_lock = threading.Lock()
+
+@lru_cache(maxsize=4096)
+def _mask_token(token: bytes) -> bytes:
+    """Keep the first four bytes of a detected secret and star out the rest"""
+    return token[:4] + b'*' * (len(token) - 4) if len(token) > 4 else token
+
+def _mask_match(match: re.Match) -> bytes:
+    """Mask the secret value of a match, leaving the keyword before it readable"""
+    value_group = _SECRET_VALUE_GROUPS[match.lastgroup]
+    offset = match.start()
+    value_start, value_end = match.span(value_group)
+    token = match.group(0)
+    return token[:value_start - offset] + _mask_token(match.group(value_group)) + token[value_end - offset:]
+
+def _scan_file_for_secrets(path: str, repo_path: str) -> List[Dict[str, Any]]:
+    """Scan a single file for secrets; module-level so it can run in a worker process"""
+    findings = []
+    try:
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # Files without a single trigger keyword never reach the full alternation
+            trigger = _SECRET_TRIGGER_RE_B.search(mm)
+            if trigger is None:
+                return findings
+            
+            rel_path = os.path.relpath(path, repo_path)
+            # Newline offsets let each trigger offset be mapped back to its line number
+            newlines = array('Q', (match.start() for match in _NEWLINE_RE_B.finditer(mm)))
+            
+            while trigger is not None:
+                line_index = bisect_left(newlines, trigger.start())
+                line_start = newlines[line_index - 1] + 1 if line_index else 0
+                line_end = newlines[line_index] if line_index < len(newlines) else len(mm)
+                
+                # Group this line's matches by secret type
+                line_matches = {}
+                for match in _COMBINED_SECRETS_RE_B.finditer(mm, line_start, line_end):
+                    line_matches.setdefault(match.lastgroup, []).append(match)
+                
+                if line_matches:
+                    # Only the matched line is copied out of the map, masked in one pass and decoded
+                    masked_line = _COMBINED_SECRETS_RE_B.sub(
+                        _mask_match, mm[line_start:line_end].strip()
+                    ).decode('utf-8', errors='ignore')
+                    
+                    for name, matches in line_matches.items():
+                        findings.append({
+                            'file': rel_path,
+                            'line': line_index + 1,
+                            'type': _SECRET_TYPES[name],
+                            'matches': len(matches),
+                            'context': masked_line[:100] + '...' if len(masked_line) > 100 else masked_line,
+                            'severity': 'HIGH' if name in _HIGH_SEVERITY_SECRETS else 'MEDIUM'
+                        })
+                
+                # Resume the keyword search on the next line
+                trigger = _SECRET_TRIGGER_RE_B.search(mm, line_end + 1)
+    except Exception:
+        pass
+    return findings
 
 class SecurityAnalyzer:
     @staticmethod
-    def analyze_secrets(repo_path: str) -> Dict[str, Any]:
+    def analyze_secrets(repo_path: str, files: Optional[Iterable[Tuple[os.DirEntry, str]]] = None) -> Dict[str, Any]:
         """Detect exposed secrets, API keys, passwords with enhanced details"""
         try:
-            # Enhanced patterns with descriptions
-            secrets_patterns = [
-                (r'(?i)(api[_-]?key|secret[_-]?key|access[_-]?token)\s*[:=]\s*["\']?([a-zA-Z0-9_-]{20,})["\']?', 'API Key/Secret'),
-                (r'(?i)(password|passwd|pwd)\s*[:=]\s*["\']?([^\s"\']{8,})["\']?', 'Password'),
-                (r'["\']?[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}["\']?', 'UUID/Token'),
-                (r'(?i)github[_-]?token\s*[:=]\s*["\']?([a-zA-Z0-9_]{40})["\']?', 'GitHub Token'),
-                (r'(?i)aws[_-]?access[_-]?key[_-]?id\s*[:=]\s*["\']?([A-Z0-9]{20})["\']?', 'AWS Access Key'),
-                (r'(?i)jwt[_-]?token\s*[:=]\s*["\']?([A-Za-z0-9-_=]+\.[A-Za-z0-9-_=]+\.?[A-Za-z0-9-_.+/=]*)["\']?', 'JWT Token'),
-                (r'(?i)(private[_-]?key|secret[_-]?key)\s*[:=]\s*["\']?([A-Za-z0-9+/=]{100,})["\']?', 'Private Key'),
-                (r'(?i)slack[_-]?token\s*[:=]\s*["\']?(xox[a-zA-Z]-[a-zA-Z0-9-]+)["\']?', 'Slack Token'),
-                (r'(?i)discord[_-]?token\s*[:=]\s*["\']?([A-Za-z0-9_-]{24}\.[A-Za-z0-9_-]{6}\.[A-Za-z0-9_-]{27})["\']?', 'Discord Token')
-            ]
-            
+            files = files if files is not None else _walk_source_files(repo_path)
+            paths = [entry.path for entry, ext in files if ext in _SECRET_EXTENSIONS]
             secrets_found = []
+            total_count = high_count = medium_count = 0
+            files_affected = set()
+            scan_truncated = False
             
-            for file_path in Path(repo_path).rglob("*"):
-                if file_path.is_file() and file_path.suffix in ['.py', '.js', '.java', '.go', '.rs', '.env', '.config', '.yml', '.yaml', '.json', '.xml']:
-                    try:
-                        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                            lines = f.readlines()
-                            for line_num, line in enumerate(lines, 1):
-                                for pattern, secret_type in secrets_patterns:
-                                    matches = re.findall(pattern, line)
-                                    if matches:
-                                        # Mask the actual secret for display
-                                        masked_line = line.strip()
-                                        for match in matches:
-                                            if isinstance(match, tuple):
-                                                for part in match:
-                                                    if len(part) > 4:
-                                                        masked_line = masked_line.replace(part, part[:4] + '*' * (len(part) - 4))
-                                            else:
-                                                if len(match) > 4:
-                                                    masked_line = masked_line.replace(match, match[:4] + '*' * (len(match) - 4))
-                                        
-                                        secrets_found.append({
-                                            'file': str(file_path.relative_to(repo_path)),
-                                            'line': line_num,
-                                            'type': secret_type,
-                                            'matches': len(matches),
-                                            'context': masked_line[:100] + '...' if len(masked_line) > 100 else masked_line,
-                                            'severity': 'HIGH' if secret_type in ['AWS Access Key', 'GitHub Token', 'Private Key'] else 'MEDIUM'
-                                        })
-                    except Exception:
-                        continue
+            # Tracked files whose blob was scanned before reuse those findings
+            file_keys = _unmodified_file_keys(repo_path)
+            cached = {}
+            with _secret_scan_cache_lock:
+                for path in paths:
+                    key = file_keys.get(path)
+                    if key in _secret_scan_cache:
+                        _secret_scan_cache.move_to_end(key)
+                        cached[path] = _secret_scan_cache[key]
+            pending = [path for path in paths if path not in cached]
+            
+            # Regex scanning is CPU-bound, so large repositories are sharded across processes
+            executor = None
+            if len(pending) >= _PARALLEL_SCAN_MIN_FILES:
+                executor = ProcessPoolExecutor(max_workers=os.cpu_count(), mp_context=_SCAN_MP_CONTEXT)
+                scanned = executor.map(_scan_file_for_secrets, pending, repeat(repo_path), chunksize=64)
+            else:
+                scanned = (_scan_file_for_secrets(path, repo_path) for path in pending)
+            
+            try:
+                for path in paths:
+                    findings = cached.get(path)
+                    if findings is None:
+                        findings = next(scanned)
+                        key = file_keys.get(path)
+                        if key is not None:
+                            with _secret_scan_cache_lock:
+                                _secret_scan_cache[key] = findings
+                                if len(_secret_scan_cache) > _SECRET_SCAN_CACHE_SIZE:
+                                    _secret_scan_cache.popitem(last=False)
+                    
+                    if findings:
+                        files_affected.add(findings[0]['file'])
+                    for finding in findings:
+                        total_count += 1
+                        if finding['severity'] == 'HIGH':
+                            high_count += 1
+                        else:
+                            medium_count += 1
+                        # Only a bounded sample of findings is kept; counts cover every file scanned
+                        if len(secrets_found) < _MAX_SECRET_FINDINGS:
+                            secrets_found.append(finding)
+                    
+                    # Risk is already pinned HIGH and the security score floored, so stop scanning.
+                    # The counts are then lower bounds, which scan_truncated tells readers
+                    if high_count >= _SECRET_SATURATION_HIGH_COUNT:
+                        scan_truncated = True
+                        break
+            finally:
+                if executor is not None:
+                    executor.shutdown(cancel_futures=True)
             
             return {
                 'secrets_found': secrets_found,
-                'total_secrets': len(secrets_found),
-                'high_severity_secrets': len([s for s in secrets_found if s.get('severity') == 'HIGH']),
-                'medium_severity_secrets': len([s for s in secrets_found if s.get('severity') == 'MEDIUM']),
-                'risk_level': 'HIGH' if len(secrets_found) > 5 else 'MEDIUM' if len(secrets_found) > 0 else 'LOW',
-                'files_affected': len(set([s['file'] for s in secrets_found]))
+                'total_secrets': total_count,
+                'high_severity_secrets': high_count,
+                'medium_severity_secrets': medium_count,
+                'risk_level': 'HIGH' if total_count > 5 else 'MEDIUM' if total_count > 0 else 'LOW',
+                'files_affected': len(files_affected),
+                'scan_truncated': scan_truncated
             }
         except Exception as e:
             return {'error': f'Secret analysis failed: {str(e)}'}
@@ -151,11 +360,11 @@ class SecurityAnalyzer:
                     try:
                         result = subprocess.run([
                             'safety', 'check', '-r', str(req_file), '--json'
-                        ], capture_output=True, text=True, timeout=120)
+                        ], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=120)
                         
                         if result.stdout:
                             try:
-                                safety_data = json.loads(result.stdout)
+                                safety_data = _json_loads(result.stdout)
                                 if isinstance(safety_data, list):
                                     vulnerabilities.extend(safety_data)
                                 elif isinstance(safety_data, dict) and 'vulnerabilities' in safety_data:
@@ -176,11 +385,11 @@ class SecurityAnalyzer:
                     try:
                         result = subprocess.run([
                             'npm', 'audit', '--json'
-                        ], capture_output=True, text=True, timeout=120, cwd=repo_path)
+                        ], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=120, cwd=repo_path)
                         
                         if result.stdout:
                             try:
-                                audit_data = json.loads(result.stdout)
+                                audit_data = _json_loads(result.stdout)
                                 if 'vulnerabilities' in audit_data:
                                     for vuln_name, vuln_data in audit_data['vulnerabilities'].items():
                                         vulnerabilities.append({
@@ -197,18 +406,45 @@ class SecurityAnalyzer:
                     except Exception:
                         pass
             
+            # Severity counts and affected packages in a single pass
+            severity_counts = Counter()
+            packages_affected = set()
+            for v in vulnerabilities:
+                severity_counts[v.get('severity')] += 1
+                if v.get('package'):
+                    packages_affected.add(v['package'])
+            
             return {
                 'vulnerabilities': vulnerabilities,
                 'total_vulnerabilities': len(vulnerabilities),
-                'critical_severity': len([v for v in vulnerabilities if v.get('severity') == 'critical']),
-                'high_severity': len([v for v in vulnerabilities if v.get('severity') == 'high']),
-                'medium_severity': len([v for v in vulnerabilities if v.get('severity') == 'medium']),
-                'low_severity': len([v for v in vulnerabilities if v.get('severity') == 'low']),
-                'packages_affected': len(set([v.get('package', '') for v in vulnerabilities if v.get('package')]))
+                'critical_severity': severity_counts['critical'],
+                'high_severity': severity_counts['high'],
+                'medium_severity': severity_counts['medium'],
+                'low_severity': severity_counts['low'],
+                'packages_affected': len(packages_affected)
             }
         except Exception as e:
             return {'error': f'Dependency analysis failed: {str(e)}'}
 
+# Coverage grades: D below 40%, C from 40%, B from 60%, A from 80%
+_COVERAGE_GRADE_CUTOFFS = [40, 60, 80]
+_COVERAGE_GRADES = 'DCBA'
+# Quality score penalties: 40 below 20% coverage, then 25, 15 and 8 below 50%, 70% and 80%, none from 80%
+_COVERAGE_PENALTY_CUTOFFS = [20, 50, 70, 80]
+_COVERAGE_PENALTIES = [40, 25, 15, 8, 0]
+# Overall grades: F up to 60, then D, C, B and A strictly above 60, 70, 80 and 90
+_OVERALL_GRADE_CUTOFFS = [60, 70, 80, 90]
+_OVERALL_GRADES = 'FDCBA'
+
+def grade_for_score(score: float) -> str:
+    """Letter grade for an overall 0-100 score"""
+    return _OVERALL_GRADES[bisect_left(_OVERALL_GRADE_CUTOFFS, score)]
+
+_PY_TEST_DIRS = frozenset({'tests', 'test'})
+_JS_TEST_DIRS = frozenset({'test', 'tests', '__tests__'})
+_JS_TEST_SUFFIXES = ('.test.js', '.spec.js', '.test.ts', '.spec.ts')
+_TEST_FUNC_RE_B = re.compile(rb'def test_\w+')
+
 class QualityAnalyzer:
     @staticmethod
     def analyze_code_duplication(repo_path: str, language: str) -> Dict[str, Any]:
@@ -219,12 +455,12 @@ class QualityAnalyzer:
                     result = subprocess.run([
                         'pylint', '--disable=all', '--enable=duplicate-code', 
                         '--output-format=json', '--recursive=y', repo_path
-                    ], capture_output=True, text=True, timeout=300)
+                    ], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=300)
                     
                     duplications = []
                     if result.stdout:
                         try:
-                            pylint_data = json.loads(result.stdout)
+                            pylint_data = _json_loads(result.stdout)
                             duplications = [item for item in pylint_data if item.get('message-id') == 'R0801']
                             
                             # Enhance duplication data with more details
@@ -247,7 +483,7 @@ class QualityAnalyzer:
                         'duplications_found': duplications,
                         'total_duplications': len(duplications),
                         'duplication_score': max(0, 100 - (len(duplications) * 10)),
-                        'files_affected': len(set([d.get('path', '') for d in duplications]))
+                        'files_affected': len({d.get('path', '') for d in duplications})
                     }
                 except FileNotFoundError:
                     return {'error': 'Pylint not found. Install with: pip install pylint'}
@@ -261,26 +497,24 @@ class QualityAnalyzer:
             return {'error': f'Duplication analysis failed: {str(e)}'}
 
     @staticmethod
-    def analyze_test_coverage(repo_path: str, language: str) -> Dict[str, Any]:
+    def analyze_test_coverage(repo_path: str, language: str, files: Optional[Iterable[Tuple[os.DirEntry, str]]] = None) -> Dict[str, Any]:
         """Analyze test coverage with enhanced metrics"""
         try:
             coverage_data = {}
+            files = list(files if files is not None else _walk_source_files(repo_path))
+            # Walker paths all start with the repo root, so slicing it off gives the relative path
+            root_len = len(os.path.join(repo_path, ''))
             
             if language == 'python':
-                # Look for test files with more patterns
-                test_patterns = ['test_*.py', '*_test.py', 'tests/*.py', 'test/*.py', '**/test_*.py', '**/tests/*.py']
-                test_files = []
-                
-                for pattern in test_patterns:
-                    test_files.extend(list(Path(repo_path).rglob(pattern)))
-                
-                # Remove duplicates
-                test_files = list(set(test_files))
+                # Test files: test_*.py, *_test.py, or any .py under a tests/ or test/ directory
+                test_files = [entry.path for entry, _ in files
+                              if entry.name.endswith('.py') and (
+                                  entry.name.startswith('test_') or entry.name.endswith('_test.py')
+                                  or os.path.basename(os.path.dirname(entry.path)) in _PY_TEST_DIRS)]
                 
                 # Find source files
-                source_files = list(Path(repo_path).rglob('*.py'))
-                source_files = [f for f in source_files if not any(test_indicator in str(f).lower() 
-                                                                  for test_indicator in ['test', '__pycache__', '.pyc'])]
+                source_files = [entry for entry, ext in files
+                                if ext == '.py' and 'test' not in entry.path[root_len:].lower()]
                 
                 # Calculate coverage metrics
                 total_test_files = len(test_files)
@@ -292,9 +526,8 @@ class QualityAnalyzer:
                 test_functions = 0
                 for test_file in test_files[:10]:  # Check first 10 test files
                     try:
-                        with open(test_file, 'r', encoding='utf-8', errors='ignore') as f:
-                            content = f.read()
-                            test_functions += len(re.findall(r'def test_\w+', content))
+                        with open(test_file, 'rb') as f:
+                            test_functions += len(_TEST_FUNC_RE_B.findall(f.read()))
                     except:
                         pass
                 
@@ -304,22 +537,18 @@ class QualityAnalyzer:
                     'coverage_ratio': coverage_ratio,
                     'coverage_percentage': coverage_percentage,
                     'test_functions': test_functions,
-                    'coverage_grade': 'A' if coverage_percentage >= 80 else 'B' if coverage_percentage >= 60 else 'C' if coverage_percentage >= 40 else 'D'
+                    'coverage_grade': _COVERAGE_GRADES[bisect_right(_COVERAGE_GRADE_CUTOFFS, coverage_percentage)]
                 }
             
             elif language == 'javascript':
-                # Look for test files with JS/TS patterns
-                test_patterns = ['*.test.js', '*.spec.js', '*.test.ts', '*.spec.ts', 'test/*.js', 'tests/*.js', '__tests__/*.js']
-                test_files = []
-                
-                for pattern in test_patterns:
-                    test_files.extend(list(Path(repo_path).rglob(pattern)))
-                
-                test_files = list(set(test_files))
+                # Test files: *.test/spec.js|ts, or any .js under a test/, tests/ or __tests__/ directory
+                test_files = [entry.path for entry, _ in files
+                              if entry.name.endswith(_JS_TEST_SUFFIXES) or (
+                                  entry.name.endswith('.js')
+                                  and os.path.basename(os.path.dirname(entry.path)) in _JS_TEST_DIRS)]
                 
-                source_files = list(Path(repo_path).rglob('*.js')) + list(Path(repo_path).rglob('*.ts'))
-                source_files = [f for f in source_files if not any(exclude in str(f).lower() 
-                                                                  for exclude in ['test', 'node_modules', 'dist', 'build'])]
+                source_files = [entry for entry, ext in files
+                                if ext in ('.js', '.ts') and 'test' not in entry.path[root_len:].lower()]
                 
                 total_test_files = len(test_files)
                 total_source_files = len(source_files)
@@ -331,16 +560,186 @@ class QualityAnalyzer:
                     'source_files': total_source_files,
                     'coverage_ratio': coverage_ratio,
                     'coverage_percentage': coverage_percentage,
-                    'coverage_grade': 'A' if coverage_percentage >= 80 else 'B' if coverage_percentage >= 60 else 'C' if coverage_percentage >= 40 else 'D'
+                    'coverage_grade': _COVERAGE_GRADES[bisect_right(_COVERAGE_GRADE_CUTOFFS, coverage_percentage)]
                 }
             
             return coverage_data
         except Exception as e:
             return {'error': f'Coverage analysis failed: {str(e)}'}
 
+# Keywords that mark a design pattern when they follow `class` on the same line
+_CLASS_PATTERN_NAMES = {
+    b'factory': 'Factory Pattern',
+    b'singleton': 'Singleton Pattern',
+    b'observer': 'Observer Pattern',
+    b'adapter': 'Adapter Pattern',
+    b'builder': 'Builder Pattern'
+}
+_CLASS_PATTERN_RE_B = re.compile(b'|'.join(_CLASS_PATTERN_NAMES), re.IGNORECASE)
+# Captures the rest of each line after `class`, or a __call__ definition, in one scan
+_DESIGN_PATTERN_RE_B = re.compile(rb'class(?P<class_tail>.*)|(?P<callable>def\s+__call__)', re.IGNORECASE)
+
+# Score penalties per issue, by pylint message type and bandit severity
+_PYLINT_TYPE_PENALTIES = {'error': 15, 'warning': 8, 'refactor': 3, 'convention': 2}
+_BANDIT_SEVERITY_PENALTIES = {'HIGH': 25, 'MEDIUM': 10, 'LOW': 3}
+
+_LINE_COUNT_EXTENSIONS = frozenset({
+    '.py', '.js', '.java', '.cpp', '.c', '.h', '.css', '.html', '.md', '.go', '.rs', '.ts', '.jsx', '.tsx',
+    '.yml', '.yaml', '.toml', '.sh', '.rb', '.php', '.scala', '.kt'
+})
+# Larger files are almost always minified bundles or generated code, so their lines are not counted
+_LINE_COUNT_MAX_BYTES = 5_000_000
+
+def _count_lines(path: str) -> int:
+    """Count lines by scanning raw bytes for newlines in 1 MiB chunks; unreadable files count as 0"""
+    lines = 0
+    last = b'\n'
+    try:
+        with open(path, 'rb', buffering=0) as f:
+            while True:
+                chunk = f.read(1 << 20)
+                if not chunk:
+                    # A final line without a trailing newline still counts, as with readlines()
+                    return lines + (last != b'\n')
+                lines += chunk.count(b'\n')
+                last = chunk[-1:]
+    except OSError:
+        return 0
+
+def _clone_into(repo_url: str, target_dir: str) -> str:
+    """Clone a repository into target_dir and return the path"""
+    try:
+        # Blobless single-branch clone: full commit history for repository info,
+        # but only the blobs needed to check out HEAD are downloaded
+        subprocess.run([
+            'git', 'clone', '--quiet', '--filter=blob:none', '--single-branch', repo_url, target_dir
+        ], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=300)
+        return target_dir
+    except subprocess.CalledProcessError as e:
+        raise Exception(f"Failed to clone repository: {e.stderr.decode('utf-8', errors='ignore').strip()}")
+    except Exception as e:
+        raise Exception(f"Failed to clone repository: {str(e)}")
+
+def _refresh_clone(repo_url: str, target_dir: str, commit: Optional[str] = None) -> str:
+    """Bring a persistent clone at target_dir to commit (default: the remote HEAD), cloning it on first use"""
+    cloned = not os.path.isdir(os.path.join(target_dir, '.git'))
+    if cloned:
+        if os.path.exists(target_dir):
+            _remove_tree(target_dir)
+        os.makedirs(os.path.dirname(target_dir), exist_ok=True)
+        _clone_into(repo_url, target_dir)
+        if commit is None:
+            return target_dir
+    try:
+        # Only new history is downloaded; the work tree is then reset to exactly the requested commit,
+        # which a push since it was resolved leaves as an ancestor of the fetched HEAD
+        steps = [] if cloned else [['fetch', '--quiet', repo_url, 'HEAD']]
+        steps += [['reset', '--quiet', '--hard', commit or 'FETCH_HEAD'],
+                  ['clean', '--quiet', '-ffdx']]
+        for args in steps:
+            subprocess.run(['git', '-C', target_dir, *args],
+                           check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, timeout=300)
+        return target_dir
+    except subprocess.CalledProcessError as e:
+        raise Exception(f"Failed to update repository: {e.stderr.decode('utf-8', errors='ignore').strip()}")
+    except Exception as e:
+        raise Exception(f"Failed to update repository: {str(e)}")
+
+def _remove_tree(path: str):
+    """Remove a directory tree, clearing read-only bits that block deletion on Windows"""
+    def handle_remove_readonly(func, path, exc):
+        if os.path.exists(path):
+            try:
+                os.chmod(path, stat.S_IWRITE)
+                func(path)
+            except:
+                pass
+
+    if os.name == 'nt':
+        shutil.rmtree(path, onerror=handle_remove_readonly)
+    else:
+        # rm unlinks straight from its directory reads in C, well ahead of rmtree's per-entry calls
+        result = subprocess.run(['rm', '-rf', path], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        if result.returncode != 0:
+            raise OSError(result.stderr.decode('utf-8', errors='ignore').strip())
+
+def _remove_tree_in_background(path: str, description: str):
+    """Delete a tree on a worker thread so the caller does not wait on thousands of unlinks"""
+    def remove():
+        try:
+            _remove_tree(path)
+        except Exception as e:
+            print(f"Warning: Could not clean up {description}: {path} - {e}")
+
+    # Not a daemon: interpreter shutdown waits for the delete instead of abandoning it half done
+    threading.Thread(target=remove, name='cleanup').start()
+
+def _run_git(repo_path: str, *args: str, strip: bool = True) -> Optional[str]:
+    """Run a git command in repo_path and return its (stripped) output, or None if it fails"""
+    try:
+        result = subprocess.run(['git', '-C', repo_path, *args],
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=60)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0:
+        return None
+    output = result.stdout.decode('utf-8', errors='replace')
+    return output.strip() if strip else output
+
+def _repo_fingerprint(repo_path: str) -> str:
+    """Fingerprint a checkout as it is now, cheaply enough to recheck on every memoized call.
+    
+    In a git checkout this is the HEAD commit and tree plus `git status`, with the size and mtime
+    of each changed path; outside git every source file is walked and stat'ed again.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    # The commit, not just its tree, so a commit that changes no files still refreshes commit stats
+    head = _run_git(repo_path, 'rev-parse', 'HEAD', 'HEAD^{tree}')
+    status = _run_git(repo_path, 'status', '--porcelain', '-z', '--untracked-files=all', strip=False) if head else None
+    if status is not None:
+        digest.update(f"{head}\0{status}".encode())
+        # One status line can cover successive edits to a file, so changed paths are stat'ed too
+        rel_paths = [record[3:] for record in status.split('\0') if len(record) > 3]
+    else:
+        rel_paths = [os.path.relpath(entry.path, repo_path) for entry, _ in _walk_source_files(repo_path)]
+    
+    for rel_path in sorted(rel_paths):
+        try:
+            st = os.lstat(os.path.join(repo_path, rel_path))
+            digest.update(f"{rel_path}\0{st.st_size}\0{st.st_mtime_ns}\n".encode())
+        except OSError:
+            digest.update(f"{rel_path}\0missing\n".encode())
+    return digest.hexdigest()
+
+def _memoize_by_checkout(method):
+    """Reuse a CodeAnalyzer result while the checkout's fingerprint and any languages argument are unchanged"""
+    @wraps(method)
+    def wrapper(self, repo_path: str, *args) -> Dict[str, Any]:
+        fingerprint = self.get_fingerprint(repo_path)
+        key = (method.__name__, repo_path, fingerprint,
+               *(tuple(sorted(arg.items())) if isinstance(arg, dict) else arg for arg in args))
+        with self._cache_lock:
+            if key in self._analysis_cache:
+                return self._analysis_cache[key]
+        
+        result = method(self, repo_path, *args)
+        if 'error' not in result:
+            with self._cache_lock:
+                # Not cached if the checkout moved on while this was computed
+                if self._fingerprints.get(repo_path) == fingerprint:
+                    self._analysis_cache[key] = result
+        return result
+    return wrapper
+
 class CodeAnalyzer:
     def __init__(self):
         self.temp_dir = None
+        self._file_index = {}
+        self._fingerprints = {}
+        self._analysis_cache = {}
+        # Tool calls, their worker threads and the streaming executor share one analyzer, so the
+        # fingerprint check-and-forget and every cache insert happen under this lock
+        self._cache_lock = threading.RLock()
         self.language_detector = LanguageDetector()
         self.security_analyzer = SecurityAnalyzer()
         self.quality_analyzer = QualityAnalyzer()
@@ -348,15 +747,49 @@ class CodeAnalyzer:
     def clone_repository(self, repo_url: str) -> str:
         """Clone GitHub repository to temporary directory"""
         self.temp_dir = tempfile.mkdtemp()
-        try:
-            git.Repo.clone_from(repo_url, self.temp_dir)
-            return self.temp_dir
-        except Exception as e:
-            raise Exception(f"Failed to clone repository: {str(e)}")
+        return _clone_into(repo_url, self.temp_dir)
 
+    def forget_repository(self, repo_path: str):
+        """Drop every cached index, fingerprint and analysis result for a checkout"""
+        with self._cache_lock:
+            self._file_index.pop(repo_path, None)
+            self._fingerprints.pop(repo_path, None)
+            for key in [key for key in self._analysis_cache if key[1] == repo_path]:
+                del self._analysis_cache[key]
+
+    def get_file_index(self, repo_path: str) -> List[Tuple[os.DirEntry, str]]:
+        """Walk the repository once and reuse the file list across analysis passes"""
+        with self._cache_lock:
+            file_index = self._file_index.get(repo_path)
+            fingerprint = self._fingerprints.get(repo_path)
+        if file_index is not None:
+            return file_index
+        if fingerprint is None:
+            fingerprint = self.get_fingerprint(repo_path)
+        
+        # Prune by name and by the repository's own ignore rules, so ignored trees are never listed
+        file_index = list(_walk_source_files(repo_path, skip_paths=_git_ignored_dirs(repo_path)))
+        with self._cache_lock:
+            # Kept only if the checkout is still the one this walk started on
+            if self._fingerprints.get(repo_path) == fingerprint:
+                file_index = self._file_index.setdefault(repo_path, file_index)
+        return file_index
+
+    def get_fingerprint(self, repo_path: str) -> str:
+        """Fingerprint the checkout as it is now, dropping the file index and results of an older state"""
+        fingerprint = _repo_fingerprint(repo_path)
+        with self._cache_lock:
+            previous = self._fingerprints.get(repo_path)
+            if previous != fingerprint:
+                if previous is not None:
+                    self.forget_repository(repo_path)
+                self._fingerprints[repo_path] = fingerprint
+        return fingerprint
+
+    @_memoize_by_checkout
     def analyze_security_comprehensive(self, repo_path: str, languages: Dict[str, int]) -> Dict[str, Any]:
         """Comprehensive security analysis with enhanced reporting"""
-        primary_language = max(languages.items(), key=lambda x: x[1])[0] if languages else 'unknown'
+        primary_language = _primary_language(languages, 'unknown')
         
         security_results = {
             'primary_language': primary_language,
@@ -366,24 +799,28 @@ class CodeAnalyzer:
             'security_score': 0
         }
         
-        # Static analysis (bandit for Python)
-        if primary_language == 'python':
-            security_results['static_analysis'] = self.analyze_security_python(repo_path)
-        
-        # Secrets analysis
-        security_results['secrets_analysis'] = self.security_analyzer.analyze_secrets(repo_path)
-        
-        # Dependency analysis
-        security_results['dependency_analysis'] = self.security_analyzer.analyze_dependencies(repo_path, primary_language)
+        # Static analysis (bandit for Python), secrets and dependency checks are independent
+        file_index = self.get_file_index(repo_path)
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            static_future = (executor.submit(self.analyze_security_python, repo_path)
+                             if primary_language == 'python' else None)
+            secrets_future = executor.submit(self.security_analyzer.analyze_secrets, repo_path, file_index)
+            dependency_future = executor.submit(self.security_analyzer.analyze_dependencies, repo_path, primary_language)
+            
+            if static_future is not None:
+                security_results['static_analysis'] = static_future.result()
+            security_results['secrets_analysis'] = secrets_future.result()
+            security_results['dependency_analysis'] = dependency_future.result()
         
         # Calculate overall security score
         security_results['security_score'] = self._calculate_comprehensive_security_score(security_results)
         
         return security_results
 
+    @_memoize_by_checkout
     def analyze_quality_comprehensive(self, repo_path: str, languages: Dict[str, int]) -> Dict[str, Any]:
         """Comprehensive quality analysis with enhanced reporting"""
-        primary_language = max(languages.items(), key=lambda x: x[1])[0] if languages else 'unknown'
+        primary_language = _primary_language(languages, 'unknown')
         
         quality_results = {
             'primary_language': primary_language,
@@ -403,13 +840,14 @@ class CodeAnalyzer:
         quality_results['duplication_analysis'] = self.quality_analyzer.analyze_code_duplication(repo_path, primary_language)
         
         # Test coverage
-        quality_results['test_coverage'] = self.quality_analyzer.analyze_test_coverage(repo_path, primary_language)
+        quality_results['test_coverage'] = self.quality_analyzer.analyze_test_coverage(repo_path, primary_language, self.get_file_index(repo_path))
         
         # Calculate overall quality score
         quality_results['quality_score'] = self._calculate_comprehensive_quality_score(quality_results)
         
         return quality_results
 
+    @_memoize_by_checkout
     def analyze_architecture(self, repo_path: str, languages: Dict[str, int]) -> Dict[str, Any]:
         """Analyze software architecture and structure with enhanced details"""
         try:
@@ -427,8 +865,8 @@ class CodeAnalyzer:
             total_directories = 0
             
             for root, dirs, files in os.walk(repo_path):
-                # Skip hidden and irrelevant directories
-                dirs[:] = [d for d in dirs if not d.startswith('.') and d not in ['__pycache__', 'node_modules', '.git']]
+                # Prune hidden and irrelevant directories so their subtrees are never listed
+                dirs[:] = [d for d in dirs if not d.startswith('.') and d not in _SKIP_DIRS]
                 
                 rel_root = os.path.relpath(root, repo_path)
                 if rel_root == '.':
@@ -437,16 +875,17 @@ class CodeAnalyzer:
                 total_files += len(files)
                 total_directories += len(dirs)
                 
+                file_types = {}
                 structure[rel_root] = {
                     'directories': len(dirs),
                     'files': len(files),
-                    'file_types': {}
+                    'file_types': file_types
                 }
                 
                 for file in files:
-                    ext = Path(file).suffix.lower()
+                    ext = os.path.splitext(file)[1].lower()
                     if ext:
-                        structure[rel_root]['file_types'][ext] = structure[rel_root]['file_types'].get(ext, 0) + 1
+                        file_types[ext] = file_types.get(ext, 0) + 1
             
             architecture_data['project_structure'] = structure
             architecture_data['complexity_metrics'] = {
@@ -457,37 +896,37 @@ class CodeAnalyzer:
             }
             
             # Enhanced design pattern detection
-            patterns_detected = []
+            patterns_detected = set()
             
             if 'python' in languages:
-                for file_path in Path(repo_path).rglob("*.py"):
+                for entry, ext in self.get_file_index(repo_path):
+                    if ext != '.py':
+                        continue
+                    file_path = entry.path
                     try:
-                        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                            content = f.read().lower()
+                        # Patterns are ASCII, so the raw bytes are scanned without decoding
+                        with open(file_path, 'rb') as f:
+                            content = f.read()
+                            
+                            # Single pass over the file for class-name and __call__ patterns
+                            for match in _DESIGN_PATTERN_RE_B.finditer(content):
+                                if match.lastgroup == 'callable':
+                                    patterns_detected.add('Callable Pattern')
+                                else:
+                                    for keyword in _CLASS_PATTERN_RE_B.findall(match.group('class_tail')):
+                                        patterns_detected.add(_CLASS_PATTERN_NAMES[keyword.lower()])
                             
-                            # Enhanced pattern detection
-                            if re.search(r'class.*factory', content):
-                                patterns_detected.append('Factory Pattern')
-                            if re.search(r'class.*singleton', content):
-                                patterns_detected.append('Singleton Pattern')
-                            if 'def __enter__' in content and 'def __exit__' in content:
-                                patterns_detected.append('Context Manager Pattern')
-                            if '@property' in content:
-                                patterns_detected.append('Property Pattern')
-                            if re.search(r'class.*observer', content):
-                                patterns_detected.append('Observer Pattern')
-                            if re.search(r'class.*adapter', content):
-                                patterns_detected.append('Adapter Pattern')
-                            if re.search(r'class.*builder', content):
-                                patterns_detected.append('Builder Pattern')
-                            if 'abc' in content and 'abstractmethod' in content:
-                                patterns_detected.append('Abstract Base Class Pattern')
-                            if re.search(r'def\s+__call__', content):
-                                patterns_detected.append('Callable Pattern')
+                            # Cheap literal checks
+                            if b'def __enter__' in content and b'def __exit__' in content:
+                                patterns_detected.add('Context Manager Pattern')
+                            if b'@property' in content:
+                                patterns_detected.add('Property Pattern')
+                            if b'abc' in content and b'abstractmethod' in content:
+                                patterns_detected.add('Abstract Base Class Pattern')
                     except:
                         continue
             
-            architecture_data['design_patterns'] = list(set(patterns_detected))
+            architecture_data['design_patterns'] = list(patterns_detected)
             
             # Calculate architecture score
             architecture_data['architecture_score'] = self._calculate_architecture_score(architecture_data)
@@ -501,11 +940,11 @@ class CodeAnalyzer:
         try:
             result = subprocess.run([
                 'bandit', '-r', repo_path, '-f', 'json', '-ll'  # -ll for low level and above
-            ], capture_output=True, text=True, timeout=300)
+            ], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=300)
             
             if result.stdout:
                 try:
-                    security_data = json.loads(result.stdout)
+                    security_data = _json_loads(result.stdout)
                     
                     # Enhance the security data
                     if 'results' in security_data:
@@ -534,21 +973,28 @@ class CodeAnalyzer:
     def analyze_quality_python(self, repo_path: str) -> Dict[str, Any]:
         """Python-specific quality analysis with enhanced error handling"""
         try:
-            python_files = list(Path(repo_path).rglob("*.py"))
+            python_files = [entry for entry, ext in self.get_file_index(repo_path) if ext == '.py']
             if not python_files:
                 return {"error": "No Python files found"}
 
-            # Run Pylint with better error handling
-            try:
-                pylint_result = subprocess.run([
+            # Pylint and Radon are independent; run them side by side
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                pylint_future = executor.submit(subprocess.run, [
                     'pylint', '--output-format=json', '--recursive=y', repo_path,
                     '--disable=missing-module-docstring,missing-class-docstring,missing-function-docstring'
-                ], capture_output=True, text=True, timeout=300)
+                ], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=300)
+                radon_future = executor.submit(subprocess.run, [
+                    'radon', 'cc', repo_path, '--json'
+                ], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, timeout=300)
+
+            # Pylint results with better error handling
+            try:
+                pylint_result = pylint_future.result()
                 
                 pylint_data = []
                 if pylint_result.stdout:
                     try:
-                        pylint_data = json.loads(pylint_result.stdout)
+                        pylint_data = _json_loads(pylint_result.stdout)
                         
                         # Enhance pylint data with categories
                         enhanced_data = []
@@ -562,16 +1008,14 @@ class CodeAnalyzer:
             except FileNotFoundError:
                 pylint_data = []
                 
-            # Run Radon for complexity with error handling
+            # Radon complexity results with error handling
             try:
-                radon_result = subprocess.run([
-                    'radon', 'cc', repo_path, '--json'
-                ], capture_output=True, text=True, timeout=300)
+                radon_result = radon_future.result()
                 
                 radon_data = {}
                 if radon_result.stdout:
                     try:
-                        radon_data = json.loads(radon_result.stdout)
+                        radon_data = _json_loads(radon_result.stdout)
                     except json.JSONDecodeError:
                         radon_data = {}
             except FileNotFoundError:
@@ -609,66 +1053,79 @@ class CodeAnalyzer:
         
         return categories
 
+    @_memoize_by_checkout
     def get_repository_info(self, repo_path: str) -> Dict[str, Any]:
         """Get comprehensive repository information with enhanced details"""
         try:
-            repo = git.Repo(repo_path)
-            
             # Detect languages
-            languages = self.language_detector.detect_languages(repo_path)
+            file_index = self.get_file_index(repo_path)
+            languages = self.language_detector.detect_languages(repo_path, file_index)
             
-            # Count files and lines with more details
-            file_counts = {}
-            total_lines = 0
-            total_files = 0
+            # Count files, lines and size in one pass over the pruned index
+            counted_exts = []
+            total_size = 0
+            line_count_paths = []
             
-            for file_path in Path(repo_path).rglob("*"):
-                if file_path.is_file() and not any(ignore in str(file_path) for ignore in ['.git', '__pycache__', '.pyc', 'node_modules']):
-                    ext = file_path.suffix.lower()
-                    if ext:
-                        file_counts[ext] = file_counts.get(ext, 0) + 1
-                        total_files += 1
-                    
-                    # Count lines for text files
-                    if ext in ['.py', '.js', '.java', '.cpp', '.c', '.h', '.css', '.html', '.md', '.go', '.rs', '.ts', '.jsx', '.tsx']:
-                        try:
-                            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                                lines = len(f.readlines())
-                                total_lines += lines
-                        except:
-                            pass
-
-            # Get commit information
-            try:
-                commits = list(repo.iter_commits())
-                total_commits = len(commits)
+            for entry, ext in file_index:
+                if ext == '.pyc':
+                    continue
+                try:
+                    # DirEntry caches this stat, which the checkout fingerprint also uses
+                    size = entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    size = 0
+                total_size += size
                 
-                # Get recent activity
-                recent_commits = commits[:10] if commits else []
-                recent_activity = []
-                for commit in recent_commits:
-                    recent_activity.append({
-                        'sha': str(commit.hexsha[:8]),
-                        'message': commit.message.strip()[:50] + '...' if len(commit.message.strip()) > 50 else commit.message.strip(),
-                        'author': str(commit.author.name),
-                        'date': commit.committed_datetime.isoformat()
-                    })
-            except:
-                total_commits = 0
-                recent_activity = []
+                if ext:
+                    counted_exts.append(ext)
+                
+                if ext in _LINE_COUNT_EXTENSIONS and size < _LINE_COUNT_MAX_BYTES:
+                    line_count_paths.append(entry.path)
+            
+            # Count lines for text files; reads are I/O-bound, so large repositories overlap them on threads
+            if len(line_count_paths) >= _PARALLEL_SCAN_MIN_FILES:
+                with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as executor:
+                    total_lines = sum(executor.map(_count_lines, line_count_paths))
+            else:
+                total_lines = sum(map(_count_lines, line_count_paths))
+            file_counts = Counter(counted_exts)
 
+            # Get commit information straight from git: count, then the ten newest commits
+            # with their ref decorations, which also name the checked-out branch
+            commit_count = _run_git(repo_path, 'rev-list', '--count', 'HEAD')
+            total_commits = int(commit_count) if commit_count else 0
+            
+            recent_log = _run_git(repo_path, 'log', '-n', '10', '--format=%H%x1f%an%x1f%cI%x1f%D%x1f%B%x1e') or ''
+            recent_activity = []
+            branch = "Unknown"
+            for record in recent_log.split('\x1e'):
+                fields = record.strip().split('\x1f')
+                if len(fields) != 5:
+                    continue
+                sha, author, date, refs, message = fields
+                if not recent_activity and refs.startswith('HEAD -> '):
+                    branch = refs[len('HEAD -> '):].split(',')[0]
+                message = message.strip()
+                recent_activity.append({
+                    'sha': sha[:8],
+                    'message': message[:50] + '...' if len(message) > 50 else message,
+                    'author': author,
+                    'date': date
+                })
+
+            # The newest commit doubles as the last commit
             return {
-                "repository_url": repo.remotes.origin.url if repo.remotes else "Unknown",
-                "branch": repo.active_branch.name if repo.active_branch else "Unknown",
+                "repository_url": _run_git(repo_path, 'remote', 'get-url', 'origin') or "Unknown",
+                "branch": branch,
                 "total_commits": total_commits,
                 "recent_activity": recent_activity,
                 "languages_detected": languages,
-                "primary_language": max(languages.items(), key=lambda x: x[1])[0] if languages else "Unknown",
-                "file_types": file_counts,
-                "total_files": total_files,
+                "primary_language": _primary_language(languages, "Unknown"),
+                "file_types": dict(file_counts),
+                "total_files": len(counted_exts),
                 "total_lines_of_code": total_lines,
-                "last_commit": str(repo.head.commit.hexsha[:8]) if repo.head.commit else "Unknown",
-                "repository_size": sum(f.stat().st_size for f in Path(repo_path).rglob('*') if f.is_file()) / (1024 * 1024)  # Size in MB
+                "last_commit": recent_activity[0]['sha'] if recent_activity else "Unknown",
+                "repository_size": total_size / (1024 * 1024)  # Size in MB
             }
         except Exception as e:
             return {"error": f"Failed to get repository info: {str(e)}"}
@@ -681,12 +1138,9 @@ class CodeAnalyzer:
         static_analysis = security_results.get('static_analysis', {})
         if 'results' in static_analysis and isinstance(static_analysis['results'], list):
             issues = static_analysis['results']
-            high_severity = sum(1 for issue in issues if issue.get('issue_severity') == 'HIGH')
-            medium_severity = sum(1 for issue in issues if issue.get('issue_severity') == 'MEDIUM')
-            low_severity = sum(1 for issue in issues if issue.get('issue_severity') == 'LOW')
-            
-            # More severe penalty for high severity issues
-            score -= (high_severity * 25) + (medium_severity * 10) + (low_severity * 3)
+            # More severe penalty for high severity issues, counted in a single pass
+            severity_counts = Counter(issue.get('issue_severity') for issue in issues)
+            score -= sum(severity_counts[severity] * weight for severity, weight in _BANDIT_SEVERITY_PENALTIES.items())
         
         # Secrets analysis impact
         secrets_analysis = security_results.get('secrets_analysis', {})
@@ -715,26 +1169,15 @@ class CodeAnalyzer:
         pylint_issues = code_quality.get('pylint_issues', [])
         
         if isinstance(pylint_issues, list):
-            errors = sum(1 for issue in pylint_issues if issue.get('type') == 'error')
-            warnings = sum(1 for issue in pylint_issues if issue.get('type') == 'warning')
-            refactors = sum(1 for issue in pylint_issues if issue.get('type') == 'refactor')
-            conventions = sum(1 for issue in pylint_issues if issue.get('type') == 'convention')
-            
-            # Weight different issue types
-            score -= (errors * 15) + (warnings * 8) + (refactors * 3) + (conventions * 2)
+            # Weight different issue types, counted in a single pass
+            type_counts = Counter(issue.get('type') for issue in pylint_issues)
+            score -= sum(type_counts[issue_type] * weight for issue_type, weight in _PYLINT_TYPE_PENALTIES.items())
         
         # Test coverage impact
         test_coverage = quality_results.get('test_coverage', {})
         coverage_percentage = test_coverage.get('coverage_percentage', 0)
         
-        if coverage_percentage < 20:
-            score -= 40
-        elif coverage_percentage < 50:
-            score -= 25
-        elif coverage_percentage < 70:
-            score -= 15
-        elif coverage_percentage < 80:
-            score -= 8
+        score -= _COVERAGE_PENALTIES[bisect_right(_COVERAGE_PENALTY_CUTOFFS, coverage_percentage)]
         
         # Code duplication impact
         duplication_analysis = quality_results.get('duplication_analysis', {})
@@ -777,113 +1220,178 @@ class CodeAnalyzer:
     def cleanup(self):
         """Clean up temporary directory with enhanced error handling"""
         if self.temp_dir and os.path.exists(self.temp_dir):
-            try:
-                def handle_remove_readonly(func, path, exc):
-                    if os.path.exists(path):
-                        try:
-                            os.chmod(path, stat.S_IWRITE)
-                            func(path)
-                        except:
-                            pass
+            _remove_tree_in_background(self.temp_dir, 'temporary directory')
+
+# Tools share one analyzer and an LRU of clones keyed by (repo_url, remote HEAD sha), so
+# calling several tools on the same commit clones once and reuses cached analyses. The lock
+# only guards the LRU and the use counts, never a clone
+_CLONE_CACHE_SIZE = 8
+_clone_cache_root = tempfile.mkdtemp(prefix='code_analysis_')
+_clone_cache: "OrderedDict[Tuple[str, str], _CachedClone]" = OrderedDict()
+_clone_cache_lock = threading.Lock()
+_tool_analyzer = CodeAnalyzer()
+atexit.register(shutil.rmtree, _clone_cache_root, ignore_errors=True)
+
+class _CachedClone:
+    """A clone in the LRU: a future for its path and the number of callers using it"""
+    def __init__(self):
+        self.path = Future()
+        self.users = 0
+
+def _remote_head_sha(repo_url: str) -> str:
+    """Resolve the remote HEAD commit without cloning"""
+    result = subprocess.run(['git', 'ls-remote', repo_url, 'HEAD'],
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=60)
+    fields = result.stdout.split()
+    if result.returncode != 0 or not fields:
+        raise Exception(f"Failed to clone repository: {result.stderr.decode('utf-8', errors='ignore').strip() or 'remote HEAD not found'}")
+    return fields[0].decode('ascii')
 
-                if os.name == 'nt':
-                    shutil.rmtree(self.temp_dir, onerror=handle_remove_readonly)
-                else:
-                    shutil.rmtree(self.temp_dir)
+def _acquire_clone(repo_url: str) -> _CachedClone:
+    """Take a use of the cached clone of repo_url at its remote HEAD, cloning it if needed"""
+    key = (repo_url, _remote_head_sha(repo_url))
+    with _clone_cache_lock:
+        clone = _clone_cache.get(key)
+        cloning = clone is None
+        if cloning:
+            clone = _clone_cache[key] = _CachedClone()
+        else:
+            _clone_cache.move_to_end(key)
+        clone.users += 1
+    
+    if cloning:
+        try:
+            # A fresh directory per clone, so a re-clone never races the removal of an evicted one
+            clone.path.set_result(_clone_into(repo_url, tempfile.mkdtemp(dir=_clone_cache_root)))
+        except BaseException as e:
+            with _clone_cache_lock:
+                if _clone_cache.get(key) is clone:
+                    del _clone_cache[key]
+            clone.path.set_exception(e)
+    
+    # Another caller may be cloning this commit: wait for its result
+    try:
+        clone.path.result()
+    except BaseException:
+        _release_clone(clone)
+        raise
+    return clone
+
+def _release_clone(clone: _CachedClone):
+    """Give back a use of a clone, then delete least recently used clones nobody is using"""
+    evicted = []
+    with _clone_cache_lock:
+        clone.users -= 1
+        excess = len(_clone_cache) - _CLONE_CACHE_SIZE
+        for key, cached in list(_clone_cache.items()):
+            if excess <= 0:
+                break
+            # Clones in use (including any still cloning) stay until their last user releases them
+            if cached.users == 0:
+                del _clone_cache[key]
+                evicted.append(cached.path.result())
+                excess -= 1
+    
+    for path in evicted:
+        _tool_analyzer.forget_repository(path)
+        _remove_tree_in_background(path, 'cached clone')
+
+@contextmanager
+def _checked_out_repository(repo_url: str) -> Iterator[str]:
+    """Hold a cached clone of repo_url at its remote HEAD for the duration of the block"""
+    clone = _acquire_clone(repo_url)
+    try:
+        yield clone.path.result()
+    finally:
+        _release_clone(clone)
+
+def _repository_tool(error_prefix: str):
+    """Turn fn(analyzer, repo_path, languages) into an MCP tool taking repo_url, run on a cached clone"""
+    def decorator(fn):
+        def tool(repo_url: str) -> Dict[str, Any]:
+            try:
+                with _checked_out_repository(repo_url) as repo_path:
+                    languages = _tool_analyzer.language_detector.detect_languages(repo_path, _tool_analyzer.get_file_index(repo_path))
+                    return fn(_tool_analyzer, repo_path, languages)
             except Exception as e:
-                print(f"Warning: Could not clean up temporary directory: {self.temp_dir} - {e}")
+                return {"error": f"{error_prefix}: {str(e)}"}
+
+        # Copy the name and docstring only: MCP builds the tool schema from tool's own signature
+        update_wrapper(tool, fn, assigned=('__module__', '__name__', '__qualname__', '__doc__'), updated=())
+        del tool.__wrapped__
+        return tool
+    return decorator
 
 # MCP Tools (keeping all existing tools)
 @mcp.tool()
-def detect_project_languages(repo_url: str) -> Dict[str, Any]:
+@_repository_tool("Language detection failed")
+def detect_project_languages(analyzer: CodeAnalyzer, repo_path: str, languages: Dict[str, int]) -> Dict[str, Any]:
     """Automatically detect programming languages in repository"""
-    analyzer = CodeAnalyzer()
-    try:
-        repo_path = analyzer.clone_repository(repo_url)
-        languages = analyzer.language_detector.detect_languages(repo_path)
-        return {
-            'languages_detected': languages,
-            'primary_language': max(languages.items(), key=lambda x: x[1])[0] if languages else 'unknown',
-            'total_files_analyzed': sum(languages.values())
-        }
-    except Exception as e:
-        return {"error": f"Language detection failed: {str(e)}"}
-    finally:
-        analyzer.cleanup()
+    return {
+        'languages_detected': languages,
+        'primary_language': _primary_language(languages, 'unknown'),
+        'total_files_analyzed': sum(languages.values())
+    }
 
 @mcp.tool()
-def analyze_security_vulnerabilities(repo_url: str) -> Dict[str, Any]:
+@_repository_tool("Security analysis failed")
+def analyze_security_vulnerabilities(analyzer: CodeAnalyzer, repo_path: str, languages: Dict[str, int]) -> Dict[str, Any]:
     """Advanced security vulnerability detection"""
-    analyzer = CodeAnalyzer()
-    try:
-        repo_path = analyzer.clone_repository(repo_url)
-        languages = analyzer.language_detector.detect_languages(repo_path)
-        return analyzer.analyze_security_comprehensive(repo_path, languages)
-    except Exception as e:
-        return {"error": f"Security analysis failed: {str(e)}"}
-    finally:
-        analyzer.cleanup()
+    return analyzer.analyze_security_comprehensive(repo_path, languages)
 
 @mcp.tool()
-def analyze_code_quality(repo_url: str) -> Dict[str, Any]:
+@_repository_tool("Quality analysis failed")
+def analyze_code_quality(analyzer: CodeAnalyzer, repo_path: str, languages: Dict[str, int]) -> Dict[str, Any]:
     """Comprehensive code quality analysis"""
-    analyzer = CodeAnalyzer()
-    try:
-        repo_path = analyzer.clone_repository(repo_url)
-        languages = analyzer.language_detector.detect_languages(repo_path)
-        return analyzer.analyze_quality_comprehensive(repo_path, languages)
-    except Exception as e:
-        return {"error": f"Quality analysis failed: {str(e)}"}
-    finally:
-        analyzer.cleanup()
+    return analyzer.analyze_quality_comprehensive(repo_path, languages)
 
 @mcp.tool()
-def analyze_architecture(repo_url: str) -> Dict[str, Any]:
+@_repository_tool("Architecture analysis failed")
+def analyze_architecture(analyzer: CodeAnalyzer, repo_path: str, languages: Dict[str, int]) -> Dict[str, Any]:
     """Analyze software architecture and design patterns"""
-    analyzer = CodeAnalyzer()
-    try:
-        repo_path = analyzer.clone_repository(repo_url)
-        languages = analyzer.language_detector.detect_languages(repo_path)
-        return analyzer.analyze_architecture(repo_path, languages)
-    except Exception as e:
-        return {"error": f"Architecture analysis failed: {str(e)}"}
-    finally:
-        analyzer.cleanup()
+    return analyzer.analyze_architecture(repo_path, languages)
 
 @mcp.tool()
-def analyze_repository_comprehensive(repo_url: str) -> Dict[str, Any]:
+@_repository_tool("Comprehensive analysis failed")
+def analyze_repository_comprehensive(analyzer: CodeAnalyzer, repo_path: str, languages: Dict[str, int]) -> Dict[str, Any]:
     """Complete comprehensive analysis of repository"""
-    analyzer = CodeAnalyzer()
-    try:
-        repo_path = analyzer.clone_repository(repo_url)
-        
-        # Get repository info and detect languages
-        repo_info = analyzer.get_repository_info(repo_path)
-        languages = repo_info.get('languages_detected', {})
-        
-        # Perform all analyses
-        security_results = analyzer.analyze_security_comprehensive(repo_path, languages)
-        quality_results = analyzer.analyze_quality_comprehensive(repo_path, languages)
-        architecture_results = analyzer.analyze_architecture(repo_path, languages)
-        
-        # Calculate overall score
-        security_score = security_results.get('security_score', 0)
-        quality_score = quality_results.get('quality_score', 0)
-        architecture_score = architecture_results.get('architecture_score', 0)
-        overall_score = (security_score + quality_score + architecture_score) // 3
-        
-        return {
-            "repository_info": repo_info,
-            "security_analysis": security_results,
-            "quality_analysis": quality_results,
-            "architecture_analysis": architecture_results,
-            "overall_score": overall_score,
-            "timestamp": datetime.now().isoformat()
-        }
-    except Exception as e:
-        return {"error": f"Comprehensive analysis failed: {str(e)}"}
-    finally:
-        analyzer.cleanup()
+    repo_info = analyzer.get_repository_info(repo_path)
+    
+    # Perform all analyses; they only read the clone, so run them side by side
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        security_future = executor.submit(analyzer.analyze_security_comprehensive, repo_path, languages)
+        quality_future = executor.submit(analyzer.analyze_quality_comprehensive, repo_path, languages)
+        architecture_future = executor.submit(analyzer.analyze_architecture, repo_path, languages)
+        security_results = security_future.result()
+        quality_results = quality_future.result()
+        architecture_results = architecture_future.result()
+    
+    # Calculate overall score
+    security_score = security_results.get('security_score', 0)
+    quality_score = quality_results.get('quality_score', 0)
+    architecture_score = architecture_results.get('architecture_score', 0)
+    overall_score = (security_score + quality_score + architecture_score) // 3
+    
+    return {
+        "repository_info": repo_info,
+        "security_analysis": security_results,
+        "quality_analysis": quality_results,
+        "architecture_analysis": architecture_results,
+        "overall_score": overall_score,
+        "timestamp": datetime.now().isoformat()
+    }
+
+# Issues reproduced in full in a report; the rest are only counted
+_REPORT_ISSUE_SAMPLES = 20
+
+def summarize_issues(issues: List[Dict[str, Any]], severity_key: str) -> Dict[str, Any]:
+    """Condense an issue list into its count, per-severity counts and the first few issues"""
+    issues = issues if isinstance(issues, list) else []
+    return {
+        'count': len(issues),
+        'by_severity': dict(Counter(issue.get(severity_key, 'UNKNOWN') for issue in issues)),
+        'samples': issues[:_REPORT_ISSUE_SAMPLES]
+    }
 
 @mcp.tool()
 def generate_comprehensive_report(analysis_results: Dict[str, Any], format: str = "json") -> Dict[str, Any]:
@@ -930,7 +1438,7 @@ def generate_comprehensive_report(analysis_results: Dict[str, Any], format: str
     report = {
         "executive_summary": {
             "overall_score": overall_score,
-            "overall_grade": "A" if overall_score > 90 else "B" if overall_score > 80 else "C" if overall_score > 70 else "D" if overall_score > 60 else "F",
+            "overall_grade": grade_for_score(overall_score),
             "primary_language": repo_info.get("primary_language", "Unknown"),
             "total_files": len(repo_info.get("file_types", {})),
             "total_lines": repo_info.get("total_lines_of_code", 0)
@@ -941,9 +1449,10 @@ def generate_comprehensive_report(analysis_results: Dict[str, Any], format: str
             "architecture_score": architecture_score
         },
         "key_findings": {
-            "security_issues": security.get('static_analysis', {}).get('results', []),
-            "quality_issues": quality.get('code_quality', {}).get('pylint_issues', []),
+            "security_issues": summarize_issues(security.get('static_analysis', {}).get('results', []), 'issue_severity'),
+            "quality_issues": summarize_issues(quality.get('code_quality', {}).get('pylint_issues', []), 'type'),
             "secrets_detected": security.get('secrets_analysis', {}).get('total_secrets', 0),
+            "secrets_scan_truncated": security.get('secrets_analysis', {}).get('scan_truncated', False),
             "vulnerabilities": security.get('dependency_analysis', {}).get('total_vulnerabilities', 0),
             "test_coverage": quality.get('test_coverage', {}).get('coverage_percentage', 0),
             "design_patterns": architecture.get('design_patterns', [])
@@ -962,96 +1471,172 @@ def generate_comprehensive_report(analysis_results: Dict[str, Any], format: str
     else:
         return {"report": report, "format": "json"}
 
-def generate_html_report(report: Dict[str, Any]) -> str:
-    """Generate enhanced HTML report"""
-    html = f"""
+# Every interpolated value is HTML-escaped before substitution
+_HTML_REPORT_TEMPLATE = string.Template("""
     <!DOCTYPE html>
     <html>
     <head>
         <title>Code Analysis Report</title>
         <style>
-            body {{ font-family: Arial, sans-serif; margin: 40px; }}
-            .header {{ background: #f8f9fa; padding: 20px; border-radius: 10px; margin-bottom: 30px; }}
-            .score {{ font-size: 2em; font-weight: bold; }}
-            .grade-A {{ color: #28a745; }}
-            .grade-B {{ color: #17a2b8; }}
-            .grade-C {{ color: #ffc107; }}
-            .grade-D {{ color: #fd7e14; }}
-            .grade-F {{ color: #dc3545; }}
-            .section {{ margin: 20px 0; padding: 20px; border: 1px solid #dee2e6; border-radius: 5px; }}
-            .recommendation {{ background: #e7f3ff; padding: 10px; margin: 10px 0; border-left: 4px solid #007bff; }}
-            .metric {{ display: inline-block; margin: 10px; padding: 10px; background: #f8f9fa; border-radius: 5px; }}
+            body { font-family: Arial, sans-serif; margin: 40px; }
+            .header { background: #f8f9fa; padding: 20px; border-radius: 10px; margin-bottom: 30px; }
+            .score { font-size: 2em; font-weight: bold; }
+            .grade-A { color: #28a745; }
+            .grade-B { color: #17a2b8; }
+            .grade-C { color: #ffc107; }
+            .grade-D { color: #fd7e14; }
+            .grade-F { color: #dc3545; }
+            .section { margin: 20px 0; padding: 20px; border: 1px solid #dee2e6; border-radius: 5px; }
+            .recommendation { background: #e7f3ff; padding: 10px; margin: 10px 0; border-left: 4px solid #007bff; }
+            .metric { display: inline-block; margin: 10px; padding: 10px; background: #f8f9fa; border-radius: 5px; }
         </style>
     </head>
     <body>
         <div class="header">
             <h1>🔍 Code Analysis Report</h1>
-            <div class="score grade-{report['executive_summary']['overall_grade']}">
-                Overall Grade: {report['executive_summary']['overall_grade']} ({report['executive_summary']['overall_score']}/100)
+            <div class="score grade-$overall_grade">
+                Overall Grade: $overall_grade ($overall_score/100)
             </div>
-            <p><strong>Primary Language:</strong> {report['executive_summary']['primary_language']}</p>
-            <p><strong>Total Files:</strong> {report['executive_summary']['total_files']} | <strong>Lines of Code:</strong> {report['executive_summary']['total_lines']}</p>
+            <p><strong>Primary Language:</strong> $primary_language</p>
+            <p><strong>Total Files:</strong> $total_files | <strong>Lines of Code:</strong> $total_lines</p>
         </div>
         
         <div class="section">
             <h2>📊 Detailed Scores</h2>
             <div class="metric">
-                <strong>Security:</strong> {report['detailed_scores']['security_score']}/100
+                <strong>Security:</strong> $security_score/100
             </div>
             <div class="metric">
-                <strong>Quality:</strong> {report['detailed_scores']['quality_score']}/100
+                <strong>Quality:</strong> $quality_score/100
             </div>
             <div class="metric">
-                <strong>Architecture:</strong> {report['detailed_scores']['architecture_score']}/100
+                <strong>Architecture:</strong> $architecture_score/100
             </div>
         </div>
         
         <div class="section">
             <h2>🔍 Key Findings</h2>
-            <p><strong>Security Issues:</strong> {len(report['key_findings']['security_issues'])}</p>
-            <p><strong>Quality Issues:</strong> {len(report['key_findings']['quality_issues'])}</p>
-            <p><strong>Secrets Detected:</strong> {report['key_findings']['secrets_detected']}</p>
-            <p><strong>Vulnerabilities:</strong> {report['key_findings']['vulnerabilities']}</p>
-            <p><strong>Test Coverage:</strong> {report['key_findings']['test_coverage']:.1f}%</p>
-            <p><strong>Design Patterns:</strong> {', '.join(report['key_findings']['design_patterns']) if report['key_findings']['design_patterns'] else 'None detected'}</p>
+            <p><strong>Security Issues:</strong> $security_issues</p>
+            <p><strong>Quality Issues:</strong> $quality_issues</p>
+            <p><strong>Secrets Detected:</strong> $secrets_detected</p>
+            <p><strong>Vulnerabilities:</strong> $vulnerabilities</p>
+            <p><strong>Test Coverage:</strong> $test_coverage%</p>
+            <p><strong>Design Patterns:</strong> $design_patterns</p>
         </div>
         
         <div class="section">
             <h2>💡 Recommendations</h2>
-            {''.join([f'<div class="recommendation">{rec}</div>' for rec in report['recommendations']])}
+            $recommendations
         </div>
         
         <div class="section">
             <h2>🔧 Technical Details</h2>
-            <p><strong>Repository URL:</strong> {report['technical_details']['repository_url']}</p>
-            <p><strong>Analysis Timestamp:</strong> {report['technical_details']['analysis_timestamp']}</p>
-            <p><strong>Languages Detected:</strong> {', '.join([f'{lang}: {count}' for lang, count in report['technical_details']['languages_detected'].items()])}</p>
+            <p><strong>Repository URL:</strong> $repository_url</p>
+            <p><strong>Analysis Timestamp:</strong> $analysis_timestamp</p>
+            <p><strong>Languages Detected:</strong> $languages_detected</p>
         </div>
     </body>
     </html>
-    """
-    return html
+    """)
+
+def generate_html_report(report: Dict[str, Any]) -> str:
+    """Generate enhanced HTML report"""
+    summary = report['executive_summary']
+    scores = report['detailed_scores']
+    findings = report['key_findings']
+    details = report['technical_details']
+    
+    return _HTML_REPORT_TEMPLATE.substitute(
+        overall_grade=html.escape(str(summary['overall_grade'])),
+        overall_score=html.escape(str(summary['overall_score'])),
+        primary_language=html.escape(str(summary['primary_language'])),
+        total_files=html.escape(str(summary['total_files'])),
+        total_lines=html.escape(str(summary['total_lines'])),
+        security_score=html.escape(str(scores['security_score'])),
+        quality_score=html.escape(str(scores['quality_score'])),
+        architecture_score=html.escape(str(scores['architecture_score'])),
+        security_issues=findings['security_issues']['count'],
+        quality_issues=findings['quality_issues']['count'],
+        secrets_detected=('at least ' if findings.get('secrets_scan_truncated') else '') + html.escape(str(findings['secrets_detected'])),
+        vulnerabilities=html.escape(str(findings['vulnerabilities'])),
+        test_coverage=f"{findings['test_coverage']:.1f}",
+        design_patterns=html.escape(', '.join(findings['design_patterns']) if findings['design_patterns'] else 'None detected'),
+        recommendations=''.join(f'<div class="recommendation">{html.escape(rec)}</div>' for rec in report['recommendations']),
+        repository_url=html.escape(str(details['repository_url'])),
+        analysis_timestamp=html.escape(str(details['analysis_timestamp'])),
+        languages_detected=html.escape(', '.join(f'{lang}: {count}' for lang, count in details['languages_detected'].items()))
+    )
 
 if __name__ == "__main__":
     mcp.run()
 
 from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+import asyncio
 import uvicorn
 
 app = FastAPI()
 
+def _release_when_idle(executor: ThreadPoolExecutor, acquired: Future):
+    """Wait for an executor's analysis threads to finish, then release the clone they were reading"""
+    executor.shutdown(wait=True)
+    if not acquired.cancelled() and acquired.exception() is None:
+        _release_clone(acquired.result())
+
+async def _stream_repository_analysis(repo_url: str):
+    """Yield newline-delimited JSON, one line per analysis phase as soon as it finishes"""
+    def line(payload: Dict[str, Any]) -> bytes:
+        return (json.dumps(payload, default=str) + "\n").encode()
+
+    # Worker threads keep running if the client disconnects mid-stream, so the clone is
+    # released only after the last of them finishes, not when the generator closes
+    executor = ThreadPoolExecutor(max_workers=3)
+    acquired = executor.submit(_acquire_clone, repo_url)
+    try:
+        repo_path = (await asyncio.wrap_future(acquired)).path.result()
+        repo_info = await asyncio.wrap_future(executor.submit(_tool_analyzer.get_repository_info, repo_path))
+        yield line({"phase": "repository_info", "result": repo_info})
+        languages = repo_info.get('languages_detected', {})
+        
+        phases = {
+            "security_analysis": ('security_score', _tool_analyzer.analyze_security_comprehensive),
+            "quality_analysis": ('quality_score', _tool_analyzer.analyze_quality_comprehensive),
+            "architecture_analysis": ('architecture_score', _tool_analyzer.analyze_architecture)
+        }
+        async def run_phase(phase, method):
+            return phase, await asyncio.wrap_future(executor.submit(method, repo_path, languages))
+
+        scores = {}
+        for finished in asyncio.as_completed([run_phase(phase, method) for phase, (_, method) in phases.items()]):
+            phase, result = await finished
+            scores[phase] = result.get(phases[phase][0], 0)
+            yield line({"phase": phase, "result": result})
+        
+        yield line({
+            "phase": "summary",
+            "result": {"overall_score": sum(scores.values()) // 3, "timestamp": datetime.now().isoformat()}
+        })
+    except Exception as e:
+        yield line({"phase": "error", "error": f"Comprehensive analysis failed: {str(e)}"})
+    finally:
+        threading.Thread(target=_release_when_idle, args=(executor, acquired), name='release-clone').start()
+
 @app.post("/evaluate")
 async def evaluate(request: Request):
     data = await request.json()
+    repo_url = data.get("repo_url", "")
+
+    if data.get("stream"):
+        return StreamingResponse(_stream_repository_analysis(repo_url), media_type="application/x-ndjson")
 
     try:
-        result = await analyze_repository_comprehensive(
-            repo_url=data.get("repo_url", "")
-        )
+        # The analysis is blocking, so run it off the event loop to keep other requests served
+        result = await asyncio.to_thread(analyze_repository_comprehensive, repo_url)
         return {"success": True, "result": result, "error": None}
     except Exception as e:
         return {"success": False, "result": None, "error": str(e)}
 
 if __name__ == "__main__":
+    # A single process serves requests concurrently; for more throughput run
+    # `uvicorn code_mcp_server:app --host 0.0.0.0 --port 7903 --workers N`
     uvicorn.run(app, host="0.0.0.0", port=7903)
-
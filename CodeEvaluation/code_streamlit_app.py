@@ -4,20 +4,22 @@ import sys
 import os
 import tempfile
 import base64
+import hashlib
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any
-import plotly.express as px
-import plotly.graph_objects as go
-import pandas as pd
-import plotly.io as pio
-pio.templates.default = "plotly_dark"
+from typing import Dict, Any, List, Union
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-# Add current directory to path
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-# Import MCP server functions
-from code_mcp_server import CodeAnalyzer, generate_html_report
+# Add current directory to path; the MCP server, pandas and Plotly are imported on first use,
+# so the landing page renders without paying for them
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 # Page configuration
 st.set_page_config(
@@ -27,20 +29,75 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-def run_comprehensive_analysis(repo_url: str) -> Dict[str, Any]:
-    """Run comprehensive code analysis"""
-    analyzer = CodeAnalyzer()
+# Markers for dependency vulnerability severities and recommendation priorities
+SEVERITY_EMOJI = {"high": "🔴", "medium": "🟡", "low": "🟢"}
+PRIORITY_EMOJI = {
+    "CRITICAL": "🔴",
+    "HIGH": "🟠",
+    "MEDIUM": "🟡",
+    "LOW": "🟢",
+    "INFO": "🔵"
+}
+
+# Tables are passed to st.dataframe as plain DataFrames, formatted through column_config
+# rather than a pandas Styler, which renders far slower
+DATAFRAME_OPTIONS = dict(use_container_width=True, hide_index=True)
+
+# Repositories are cloned once here and refreshed with git fetch on later analyses; the least
+# recently analyzed clones beyond the number of cached analyses are deleted
+CLONE_CACHE_DIR = os.path.join(os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache'), 'project-evaluator-mcp')
+CLONE_CACHE_LIMIT = 16
+
+@st.cache_resource
+def _clone_lock(clone_name: str) -> threading.Lock:
+    """One lock per clone directory, shared across sessions, guarding that persistent clone"""
+    return threading.Lock()
+
+def _prune_clones():
+    """Delete the least recently analyzed clones beyond CLONE_CACHE_LIMIT, skipping any in use"""
+    from code_mcp_server import _remove_tree
+    
     try:
-        repo_path = analyzer.clone_repository(repo_url)
+        clones = sorted(os.scandir(CLONE_CACHE_DIR), key=lambda entry: entry.stat().st_mtime, reverse=True)
+    except OSError:
+        return
+    for entry in clones[CLONE_CACHE_LIMIT:]:
+        lock = _clone_lock(entry.name)
+        if lock.acquire(blocking=False):
+            try:
+                _remove_tree(entry.path)
+            except OSError:
+                pass
+            finally:
+                lock.release()
+
+@st.cache_data(show_spinner=False, ttl=3600, max_entries=CLONE_CACHE_LIMIT)
+def _analyze_repository(repo_url: str, head_sha: str) -> Dict[str, Any]:
+    """Refresh a repository's clone to head_sha and analyze it; a new push is analyzed afresh"""
+    from code_mcp_server import CodeAnalyzer, _refresh_clone
+    
+    analyzer = CodeAnalyzer()
+    clone_name = hashlib.blake2b(repo_url.encode(), digest_size=16).hexdigest()
+    repo_path = os.path.join(CLONE_CACHE_DIR, clone_name)
+    with _clone_lock(clone_name):
+        # Checked out at exactly the commit this result is cached under, even if HEAD has moved since
+        _refresh_clone(repo_url, repo_path, head_sha)
+        # The directory's mtime records when it was last analyzed, for pruning
+        os.utime(repo_path)
         
-        # Get repository info and detect languages
-        repo_info = analyzer.get_repository_info(repo_path)
-        languages = repo_info.get('languages_detected', {})
+        # Detect languages from the file index, so repository info need not finish first
+        languages = analyzer.language_detector.detect_languages(repo_path, analyzer.get_file_index(repo_path))
         
-        # Perform all analyses
-        security_results = analyzer.analyze_security_comprehensive(repo_path, languages)
-        quality_results = analyzer.analyze_quality_comprehensive(repo_path, languages)
-        architecture_results = analyzer.analyze_architecture(repo_path, languages)
+        # Gather repository info and perform all analyses; they only read the clone, so run them side by side
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            repo_info_future = executor.submit(analyzer.get_repository_info, repo_path)
+            security_future = executor.submit(analyzer.analyze_security_comprehensive, repo_path, languages)
+            quality_future = executor.submit(analyzer.analyze_quality_comprehensive, repo_path, languages)
+            architecture_future = executor.submit(analyzer.analyze_architecture, repo_path, languages)
+            repo_info = repo_info_future.result()
+            security_results = security_future.result()
+            quality_results = quality_future.result()
+            architecture_results = architecture_future.result()
         
         # Calculate overall score
         security_score = security_results.get('security_score', 0)
@@ -48,7 +105,7 @@ def run_comprehensive_analysis(repo_url: str) -> Dict[str, Any]:
         architecture_score = architecture_results.get('architecture_score', 0)
         overall_score = (security_score + quality_score + architecture_score) // 3
         
-        return {
+        results = {
             "repository_info": repo_info,
             "security_analysis": security_results,
             "quality_analysis": quality_results,
@@ -57,49 +114,124 @@ def run_comprehensive_analysis(repo_url: str) -> Dict[str, Any]:
             "timestamp": datetime.now().isoformat(),
             "success": True
         }
+    
+    _prune_clones()
+    return results
+
+@st.cache_data(show_spinner=False, ttl=60, max_entries=32)
+def _resolve_head_sha(repo_url: str) -> str:
+    """Remote HEAD of a repository, re-queried at most once a minute"""
+    from code_mcp_server import _remote_head_sha
+    return _remote_head_sha(repo_url)
+
+def run_comprehensive_analysis(repo_url: str) -> Dict[str, Any]:
+    """Run comprehensive code analysis, served from cache while the remote HEAD is unchanged"""
+    try:
+        # Failures raise out of the cached functions, so they are never cached
+        return _analyze_repository(repo_url, _resolve_head_sha(repo_url))
     except Exception as e:
         return {"error": str(e), "success": False}
-    finally:
-        analyzer.cleanup()
 
-def create_score_gauge(score: int, title: str) -> go.Figure:
+@st.cache_resource
+def _configure_plotly():
+    """Apply the dashboard's Plotly defaults once per process, before the first chart is drawn"""
+    import plotly.io as pio
+    pio.templates.default = "plotly_dark"
+    if orjson is not None:
+        pio.json.config.default_engine = 'orjson'
+
+def show_chart(fig: Dict[str, Any]):
+    """Draw a figure with the dashboard's Plotly defaults"""
+    _configure_plotly()
+    st.plotly_chart(fig, use_container_width=True)
+
+# Axis, bands and threshold shared by every score gauge
+GAUGE_STYLE = {
+    'axis': {'range': [None, 100]},
+    'bar': {'color': "darkblue"},
+    'steps': [
+        {'range': [0, 50], 'color': "lightgray"},
+        {'range': [50, 80], 'color': "gray"}
+    ],
+    'threshold': {
+        'line': {'color': "red", 'width': 4},
+        'thickness': 0.75,
+        'value': 90
+    }
+}
+
+# Figures are plain dicts: st.plotly_chart accepts them, and they skip Plotly's per-property validation
+@st.cache_data(show_spinner=False, max_entries=128)
+def create_score_gauge(score: int, title: str) -> Dict[str, Any]:
     """Create a gauge chart for scores"""
-    fig = go.Figure(go.Indicator(
-        mode = "gauge+number+delta",
-        value = score,
-        domain = {'x': [0, 1], 'y': [0, 1]},
-        title = {'text': title},
-        delta = {'reference': 80},
-        gauge = {
-            'axis': {'range': [None, 100]},
-            'bar': {'color': "darkblue"},
-            'steps': [
-                {'range': [0, 50], 'color': "lightgray"},
-                {'range': [50, 80], 'color': "gray"}
-            ],
-            'threshold': {
-                'line': {'color': "red", 'width': 4},
-                'thickness': 0.75,
-                'value': 90
-            }
-        }
-    ))
-    
-    fig.update_layout(height=300)
-    return fig
+    return {
+        'data': [{
+            'type': 'indicator',
+            'mode': "gauge+number+delta",
+            'value': int(score),
+            'domain': {'x': [0, 1], 'y': [0, 1]},
+            'title': {'text': title},
+            'delta': {'reference': 80},
+            'gauge': GAUGE_STYLE
+        }],
+        'layout': {'height': 300}
+    }
 
-def create_language_chart(languages: Dict[str, int]) -> go.Figure:
+@st.cache_data(show_spinner=False)
+def create_language_chart(languages: Dict[str, int]) -> Dict[str, Any]:
     """Create pie chart for programming languages"""
     if not languages:
         return None
     
-    df = pd.DataFrame(list(languages.items()), columns=['Language', 'Files'])
-    fig = px.pie(df, values='Files', names='Language', title='Programming Languages Distribution')
-    return fig
+    return {
+        'data': [{
+            'type': 'pie',
+            'labels': list(languages),
+            'values': list(languages.values())
+        }],
+        'layout': {'title': {'text': 'Programming Languages Distribution'}}
+    }
+
+def render_findings(blocks: List[str]):
+    """Render a list of findings as a single Markdown element rather than one element per line"""
+    st.markdown("\n\n---\n\n".join(blocks))
+
+def format_security_issue(idx: int, issue: Dict[str, Any], marker: str,
+                          show_description: bool = True, show_confidence: bool = False) -> str:
+    """Format one Bandit issue as a Markdown block"""
+    get = issue.get
+    block = (f"{marker} **Issue #{idx}:** {get('test_name', 'Unknown')}\n\n"
+             f"**File:** `{get('filename', 'Unknown')}` · **Line:** {get('line_number', 'N/A')}")
+    if show_confidence:
+        block += f" · **Confidence:** {get('issue_confidence', 'Unknown')}"
+    if show_description:
+        block += f"\n\n**Description:** {get('issue_text', 'No description')}"
+    return block
 
+def format_pylint_issue(idx: int, issue: Dict[str, Any], marker: str, label: str,
+                        show_line: bool = True, show_symbol: bool = False) -> str:
+    """Format one pylint issue as a Markdown block"""
+    get = issue.get
+    block = f"{marker} **{label} #{idx}:** {get('message', 'Unknown')}\n\n**File:** `{get('path', 'Unknown')}`"
+    if show_line:
+        block += f" · **Line:** {get('line', 'N/A')}"
+    if show_symbol:
+        block += f" · **Symbol:** {get('symbol', 'N/A')}"
+    return block
+
+def section_unavailable(data: Dict[str, Any]) -> bool:
+    """Show a notice and return True when an analysis section is empty or failed"""
+    if not data or data.get('error'):
+        st.warning(f"⚠️ {data.get('error') if data else 'No data available for this section'}")
+        return True
+    return False
+
+@st.fragment
 def display_detailed_security_analysis(security_data: Dict[str, Any]):
     """Display comprehensive security analysis with detailed findings"""
     st.subheader("🔒 Security Analysis")
+    if section_unavailable(security_data):
+        return
     
     score = security_data.get("security_score", 0)
     
@@ -107,7 +239,7 @@ def display_detailed_security_analysis(security_data: Dict[str, Any]):
     
     with col1:
         fig = create_score_gauge(score, "Security Score")
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart(fig)
     
     with col2:
         st.metric("Security Score", f"{score}/100")
@@ -125,47 +257,41 @@ def display_detailed_security_analysis(security_data: Dict[str, Any]):
     if 'results' in static_analysis and static_analysis['results']:
         st.subheader("🐛 Security Vulnerabilities & Bugs")
         
-        issues = static_analysis['results']
-        high_issues = [i for i in issues if i.get('issue_severity') == 'HIGH']
-        medium_issues = [i for i in issues if i.get('issue_severity') == 'MEDIUM']
-        low_issues = [i for i in issues if i.get('issue_severity') == 'LOW']
+        # Bucket issues by severity in one pass
+        severity_buckets = {'HIGH': [], 'MEDIUM': [], 'LOW': []}
+        for issue in static_analysis['results']:
+            bucket = severity_buckets.get(issue.get('issue_severity'))
+            if bucket is not None:
+                bucket.append(issue)
+        high_issues = severity_buckets['HIGH']
+        medium_issues = severity_buckets['MEDIUM']
+        low_issues = severity_buckets['LOW']
         
-        # Summary metrics
-        col_h, col_m, col_l = st.columns(3)
-        with col_h:
-            st.metric("🔴 High Severity", len(high_issues))
-        with col_m:
-            st.metric("🟡 Medium Severity", len(medium_issues))
-        with col_l:
-            st.metric("🟢 Low Severity", len(low_issues))
+        # Summary counts as one table
+        st.dataframe({
+            'Severity': ["🔴 High", "🟡 Medium", "🟢 Low"],
+            'Count': [len(high_issues), len(medium_issues), len(low_issues)]
+        }, **DATAFRAME_OPTIONS)
         
-        # Detailed issue breakdown
-        if high_issues:
-            with st.expander(f"🔴 High Severity Issues ({len(high_issues)})", expanded=True):
-                for idx, issue in enumerate(high_issues[:10], 1):  # Show first 10
-                    st.error(f"**Issue #{idx}:** {issue.get('test_name', 'Unknown')}")
-                    st.write(f"**File:** `{issue.get('filename', 'Unknown')}`")
-                    st.write(f"**Line:** {issue.get('line_number', 'N/A')}")
-                    st.write(f"**Description:** {issue.get('issue_text', 'No description')}")
-                    st.write(f"**Confidence:** {issue.get('issue_confidence', 'Unknown')}")
-                    st.write("---")
-        
-        if medium_issues:
-            with st.expander(f"🟡 Medium Severity Issues ({len(medium_issues)})"):
-                for idx, issue in enumerate(medium_issues[:10], 1):
-                    st.warning(f"**Issue #{idx}:** {issue.get('test_name', 'Unknown')}")
-                    st.write(f"**File:** `{issue.get('filename', 'Unknown')}`")
-                    st.write(f"**Line:** {issue.get('line_number', 'N/A')}")
-                    st.write(f"**Description:** {issue.get('issue_text', 'No description')}")
-                    st.write("---")
-        
-        if low_issues:
-            with st.expander(f"🟢 Low Severity Issues ({len(low_issues)})"):
-                for idx, issue in enumerate(low_issues[:5], 1):  # Show first 5
-                    st.info(f"**Issue #{idx}:** {issue.get('test_name', 'Unknown')}")
-                    st.write(f"**File:** `{issue.get('filename', 'Unknown')}`")
-                    st.write(f"**Line:** {issue.get('line_number', 'N/A')}")
-                    st.write("---")
+        # Detailed issue breakdown: one expander per severity, summarized by file; the first
+        # 10 (5 for low) issues are only laid out on request, which reruns just this fragment
+        for marker, label, bucket, limit, options in (
+            ("🔴", "High", high_issues, 10, {'show_confidence': True}),
+            ("🟡", "Medium", medium_issues, 10, {}),
+            ("🟢", "Low", low_issues, 5, {'show_description': False})
+        ):
+            if bucket:
+                with st.expander(f"{marker} {label} Severity Issues ({len(bucket)})", expanded=(label == "High")):
+                    files = Counter(issue.get('filename', 'Unknown') for issue in bucket).most_common(10)
+                    st.dataframe({
+                        'File': [file for file, _ in files],
+                        'Issues': [count for _, count in files]
+                    }, **DATAFRAME_OPTIONS)
+                    if st.toggle("Show issue details", value=(label == "High"), key=f"security_details_{label}"):
+                        render_findings([
+                            format_security_issue(idx, issue, marker, **options)
+                            for idx, issue in enumerate(bucket[:limit], 1)
+                        ])
     else:
         st.success("✅ No security vulnerabilities detected!")
     
@@ -176,23 +302,25 @@ def display_detailed_security_analysis(security_data: Dict[str, Any]):
         total_secrets = secrets_analysis.get('total_secrets', 0)
         
         if total_secrets > 0:
+            # The scan stops early once enough HIGH-severity secrets are found, so the count is then a minimum
+            found = f"at least {total_secrets}" if secrets_analysis.get('scan_truncated') else total_secrets
             risk_level = secrets_analysis.get('risk_level', 'MEDIUM')
             if risk_level == 'HIGH':
-                st.error(f"🚨 CRITICAL: Found {total_secrets} potential secrets in the codebase!")
+                st.error(f"🚨 CRITICAL: Found {found} potential secrets in the codebase!")
             elif risk_level == 'MEDIUM':
-                st.warning(f"⚠️ WARNING: Found {total_secrets} potential secrets in the codebase!")
+                st.warning(f"⚠️ WARNING: Found {found} potential secrets in the codebase!")
             else:
-                st.info(f"ℹ️ INFO: Found {total_secrets} potential secrets in the codebase!")
+                st.info(f"ℹ️ INFO: Found {found} potential secrets in the codebase!")
             
             with st.expander("📋 View Detected Secrets Details", expanded=True):
                 secrets_found = secrets_analysis.get('secrets_found', [])
-                for idx, secret in enumerate(secrets_found, 1):
-                    st.write(f"**🔍 Secret #{idx}**")
-                    st.write(f"📁 **File:** `{secret.get('file', 'Unknown file')}`")
-                    st.write(f"🎯 **Type:** {secret.get('type', 'Unknown type')}")
-                    st.write(f"📊 **Matches:** {secret.get('matches', 0)} potential secrets")
-                    st.write("**⚠️ Action Required:** Remove or secure these secrets immediately!")
-                    st.write("---")
+                render_findings([
+                    f"**🔍 Secret #{idx}**\n\n"
+                    f"📁 **File:** `{secret.get('file', 'Unknown file')}` · 🎯 **Type:** {secret.get('type', 'Unknown type')} · "
+                    f"📊 **Matches:** {secret.get('matches', 0)} potential secrets\n\n"
+                    "**⚠️ Action Required:** Remove or secure these secrets immediately!"
+                    for idx, secret in enumerate(secrets_found, 1)
+                ])
                 
                 # Recommendations for secrets
                 st.subheader("🛡️ Security Recommendations for Secrets")
@@ -228,19 +356,21 @@ def display_detailed_security_analysis(security_data: Dict[str, Any]):
             vulnerabilities = dependency_analysis.get('vulnerabilities', [])
             if vulnerabilities:
                 with st.expander(f"📋 Vulnerability Details ({len(vulnerabilities)})", expanded=True):
-                    for idx, vuln in enumerate(vulnerabilities, 1):
-                        severity_color = {"high": "🔴", "medium": "🟡", "low": "🟢"}.get(vuln.get('severity', 'unknown'), "⚪")
-                        st.write(f"**{severity_color} Vulnerability #{idx}**")
-                        st.write(f"📦 **Package:** {vuln.get('package', 'Unknown')}")
-                        st.write(f"⚠️ **Severity:** {vuln.get('severity', 'Unknown').upper()}")
-                        st.write(f"📄 **Title:** {vuln.get('title', 'No title')}")
-                        st.write("---")
+                    render_findings([
+                        f"**{SEVERITY_EMOJI.get(vuln.get('severity', 'unknown'), '⚪')} Vulnerability #{idx}**\n\n"
+                        f"📦 **Package:** {vuln.get('package', 'Unknown')} · ⚠️ **Severity:** {vuln.get('severity', 'Unknown').upper()}\n\n"
+                        f"📄 **Title:** {vuln.get('title', 'No title')}"
+                        for idx, vuln in enumerate(vulnerabilities, 1)
+                    ])
         else:
             st.success("✅ No known vulnerabilities in dependencies!")
 
+@st.fragment
 def display_detailed_quality_analysis(quality_data: Dict[str, Any]):
     """Display comprehensive quality analysis with detailed findings"""
     st.subheader("⚡ Code Quality Analysis")
+    if section_unavailable(quality_data):
+        return
     
     score = quality_data.get("quality_score", 0)
     
@@ -248,7 +378,7 @@ def display_detailed_quality_analysis(quality_data: Dict[str, Any]):
     
     with col1:
         fig = create_score_gauge(score, "Quality Score")
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart(fig)
     
     with col2:
         st.metric("Quality Score", f"{score}/100")
@@ -270,10 +400,16 @@ def display_detailed_quality_analysis(quality_data: Dict[str, Any]):
     if isinstance(pylint_issues, list) and pylint_issues:
         st.subheader("🐛 Code Quality Issues")
         
-        errors = [i for i in pylint_issues if i.get('type') == 'error']
-        warnings = [i for i in pylint_issues if i.get('type') == 'warning']
-        conventions = [i for i in pylint_issues if i.get('type') == 'convention']
-        refactors = [i for i in pylint_issues if i.get('type') == 'refactor']
+        # Bucket issues by type in one pass
+        type_buckets = {'error': [], 'warning': [], 'convention': [], 'refactor': []}
+        for issue in pylint_issues:
+            bucket = type_buckets.get(issue.get('type'))
+            if bucket is not None:
+                bucket.append(issue)
+        errors = type_buckets['error']
+        warnings = type_buckets['warning']
+        conventions = type_buckets['convention']
+        refactors = type_buckets['refactor']
         
         # Summary metrics
         col_e, col_w, col_c, col_r = st.columns(4)
@@ -289,27 +425,24 @@ def display_detailed_quality_analysis(quality_data: Dict[str, Any]):
         # Detailed issue breakdown
         if errors:
             with st.expander(f"🔴 Errors ({len(errors)})", expanded=True):
-                for idx, error in enumerate(errors[:10], 1):
-                    st.error(f"**Error #{idx}:** {error.get('message', 'Unknown error')}")
-                    st.write(f"**File:** `{error.get('path', 'Unknown')}`")
-                    st.write(f"**Line:** {error.get('line', 'N/A')}")
-                    st.write(f"**Symbol:** {error.get('symbol', 'N/A')}")
-                    st.write("---")
+                render_findings([
+                    format_pylint_issue(idx, error, "🔴", "Error", show_symbol=True)
+                    for idx, error in enumerate(errors[:10], 1)
+                ])
         
         if warnings:
             with st.expander(f"🟡 Warnings ({len(warnings)})"):
-                for idx, warning in enumerate(warnings[:10], 1):
-                    st.warning(f"**Warning #{idx}:** {warning.get('message', 'Unknown warning')}")
-                    st.write(f"**File:** `{warning.get('path', 'Unknown')}`")
-                    st.write(f"**Line:** {warning.get('line', 'N/A')}")
-                    st.write("---")
+                render_findings([
+                    format_pylint_issue(idx, warning, "🟡", "Warning")
+                    for idx, warning in enumerate(warnings[:10], 1)
+                ])
         
         if conventions:
             with st.expander(f"🔵 Convention Issues ({len(conventions)})"):
-                for idx, conv in enumerate(conventions[:5], 1):
-                    st.info(f"**Convention #{idx}:** {conv.get('message', 'Unknown')}")
-                    st.write(f"**File:** `{conv.get('path', 'Unknown')}`")
-                    st.write("---")
+                render_findings([
+                    format_pylint_issue(idx, conv, "🔵", "Convention", show_line=False)
+                    for idx, conv in enumerate(conventions[:5], 1)
+                ])
     else:
         st.success("✅ No code quality issues detected!")
     
@@ -347,7 +480,7 @@ def display_detailed_quality_analysis(quality_data: Dict[str, Any]):
         
         # Coverage gauge
         fig = create_score_gauge(int(coverage_pct), "Test Coverage")
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart(fig)
     
     # Code Duplication Analysis
     duplication_analysis = quality_data.get('duplication_analysis', {})
@@ -369,17 +502,21 @@ def display_detailed_quality_analysis(quality_data: Dict[str, Any]):
             
             if duplications_found:
                 with st.expander("📋 Duplication Details"):
-                    for idx, dup in enumerate(duplications_found[:5], 1):
-                        st.write(f"**Duplication #{idx}**")
-                        st.write(f"**Message:** {dup.get('message', 'Unknown')}")
-                        st.write(f"**File:** {dup.get('path', 'Unknown')}")
-                        st.write("---")
+                    render_findings([
+                        f"**Duplication #{idx}**\n\n"
+                        f"**Message:** {dup.get('message', 'Unknown')}\n\n"
+                        f"**File:** {dup.get('path', 'Unknown')}"
+                        for idx, dup in enumerate(duplications_found[:5], 1)
+                    ])
         else:
             st.success("✅ No significant code duplication detected!")
 
+@st.fragment
 def display_architecture_analysis(architecture_data: Dict[str, Any]):
     """Display architecture analysis"""
     st.subheader("🏗️ Architecture Analysis")
+    if section_unavailable(architecture_data):
+        return
     
     score = architecture_data.get("architecture_score", 0)
     
@@ -387,7 +524,7 @@ def display_architecture_analysis(architecture_data: Dict[str, Any]):
     
     with col1:
         fig = create_score_gauge(score, "Architecture Score")
-        st.plotly_chart(fig, use_container_width=True)
+        show_chart(fig)
     
     with col2:
         st.metric("Architecture Score", f"{score}/100")
@@ -406,13 +543,12 @@ def display_architecture_analysis(architecture_data: Dict[str, Any]):
         st.subheader("🎨 Design Patterns Detected")
         col1, col2 = st.columns(2)
         
-        for idx, pattern in enumerate(design_patterns):
-            if idx % 2 == 0:
-                with col1:
-                    st.success(f"✅ {pattern}")
-            else:
-                with col2:
-                    st.success(f"✅ {pattern}")
+        # Patterns alternate between the columns; each column is rendered as one element
+        with col1:
+            st.success("\n\n".join(f"✅ {pattern}" for pattern in design_patterns[::2]))
+        if len(design_patterns) > 1:
+            with col2:
+                st.success("\n\n".join(f"✅ {pattern}" for pattern in design_patterns[1::2]))
         
         st.info(f"💡 **Great!** Your code implements {len(design_patterns)} design patterns, showing good architectural practices.")
     else:
@@ -441,8 +577,10 @@ def display_architecture_analysis(architecture_data: Dict[str, Any]):
             })
         
         if structure_data:
+            import pandas as pd
+            
             df = pd.DataFrame(structure_data)
-            st.dataframe(df, use_container_width=True)
+            st.dataframe(df, **DATAFRAME_OPTIONS)
             
             # Structure insights
             col1, col2, col3 = st.columns(3)
@@ -459,24 +597,19 @@ def display_architecture_analysis(architecture_data: Dict[str, Any]):
             else:
                 st.success("✅ Good directory structure organization")
 
-def generate_comprehensive_recommendations(results: Dict[str, Any]):
-    """Generate comprehensive recommendations based on analysis results"""
-    st.subheader("💡 Comprehensive Recommendations")
-    
-    security = results.get("security_analysis", {})
-    quality = results.get("quality_analysis", {})
-    architecture = results.get("architecture_analysis", {})
-    overall_score = results.get("overall_score", 0)
-    
+@st.cache_data(show_spinner=False, max_entries=256)
+def compute_recommendations(security_score: int, secrets_found: int, quality_score: int,
+                            test_coverage: float, architecture_score: int, overall_score: int) -> List[Dict[str, Any]]:
+    """Recommendations for a set of scores; 'short' is the one-line form used in reports, or None"""
     recommendations = []
     
     # Security recommendations
-    security_score = security.get('security_score', 0)
     if security_score < 70:
         recommendations.append({
             "category": "🔒 Security",
             "priority": "HIGH",
             "title": "Address Security Vulnerabilities",
+            "short": "🔒 Address security vulnerabilities and implement security best practices",
             "description": "Your code has security issues that need immediate attention.",
             "actions": [
                 "Review and fix high-severity security issues",
@@ -486,12 +619,12 @@ def generate_comprehensive_recommendations(results: Dict[str, Any]):
             ]
         })
     
-    secrets_found = security.get('secrets_analysis', {}).get('total_secrets', 0)
     if secrets_found > 0:
         recommendations.append({
             "category": "🔑 Secrets Management",
             "priority": "CRITICAL",
             "title": "Remove Exposed Secrets",
+            "short": "🔑 Remove exposed secrets and implement proper secret management",
             "description": f"Found {secrets_found} potential secrets in your codebase.",
             "actions": [
                 "Remove all hardcoded secrets immediately",
@@ -503,12 +636,12 @@ def generate_comprehensive_recommendations(results: Dict[str, Any]):
         })
     
     # Quality recommendations
-    quality_score = quality.get('quality_score', 0)
     if quality_score < 70:
         recommendations.append({
             "category": "⚡ Code Quality",
             "priority": "MEDIUM",
             "title": "Improve Code Quality",
+            "short": "⚡ Improve code quality by fixing linting issues and reducing complexity",
             "description": "Code quality can be significantly improved.",
             "actions": [
                 "Fix linting errors and warnings",
@@ -518,12 +651,13 @@ def generate_comprehensive_recommendations(results: Dict[str, Any]):
             ]
         })
     
-    test_coverage = quality.get('test_coverage', {}).get('coverage_percentage', 0)
     if test_coverage < 80:
         recommendations.append({
             "category": "🧪 Testing",
             "priority": "HIGH" if test_coverage < 50 else "MEDIUM",
             "title": "Increase Test Coverage",
+            # Reports only flag coverage below 50%
+            "short": "🧪 Increase test coverage to improve code reliability" if test_coverage < 50 else None,
             "description": f"Current test coverage is {test_coverage:.1f}%.",
             "actions": [
                 "Write unit tests for core functions",
@@ -535,12 +669,12 @@ def generate_comprehensive_recommendations(results: Dict[str, Any]):
         })
     
     # Architecture recommendations
-    architecture_score = architecture.get('architecture_score', 0)
     if architecture_score < 70:
         recommendations.append({
             "category": "🏗️ Architecture",
             "priority": "MEDIUM",
             "title": "Improve Project Structure",
+            "short": "🏗️ Improve project structure and implement design patterns",
             "description": "Project architecture can be enhanced.",
             "actions": [
                 "Organize code into logical modules",
@@ -556,6 +690,7 @@ def generate_comprehensive_recommendations(results: Dict[str, Any]):
             "category": "🎉 Excellent Work",
             "priority": "INFO",
             "title": "Maintain High Standards",
+            "short": "🎉 Excellent work! Your code meets high standards across all areas",
             "description": "Your code meets high quality standards!",
             "actions": [
                 "Continue following best practices",
@@ -565,15 +700,31 @@ def generate_comprehensive_recommendations(results: Dict[str, Any]):
             ]
         })
     
+    return recommendations
+
+def recommendations_for(results: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Recommendations for a full set of analysis results"""
+    security = results.get("security_analysis", {})
+    quality = results.get("quality_analysis", {})
+    return compute_recommendations(
+        security.get('security_score', 0),
+        security.get('secrets_analysis', {}).get('total_secrets', 0),
+        quality.get('quality_score', 0),
+        quality.get('test_coverage', {}).get('coverage_percentage', 0),
+        results.get("architecture_analysis", {}).get('architecture_score', 0),
+        results.get("overall_score", 0)
+    )
+
+@st.fragment
+def generate_comprehensive_recommendations(results: Dict[str, Any]):
+    """Generate comprehensive recommendations based on analysis results"""
+    st.subheader("💡 Comprehensive Recommendations")
+    
+    recommendations = recommendations_for(results)
+    
     # Display recommendations
     for idx, rec in enumerate(recommendations, 1):
-        priority_color = {
-            "CRITICAL": "🔴",
-            "HIGH": "🟠",
-            "MEDIUM": "🟡",
-            "LOW": "🟢",
-            "INFO": "🔵"
-        }.get(rec["priority"], "⚪")
+        priority_color = PRIORITY_EMOJI.get(rec["priority"], "⚪")
         
         with st.expander(f"{priority_color} {rec['category']}: {rec['title']}", expanded=(rec["priority"] in ["CRITICAL", "HIGH"])):
             st.write(f"**Priority:** {rec['priority']}")
@@ -582,9 +733,12 @@ def generate_comprehensive_recommendations(results: Dict[str, Any]):
             for action in rec["actions"]:
                 st.write(f"• {action}")
 
+@st.fragment
 def display_repository_info(repo_data: Dict[str, Any]):
     """Display repository information"""
     st.subheader("📊 Repository Overview")
+    if section_unavailable(repo_data):
+        return
     
     col1, col2, col3, col4 = st.columns(4)
     
@@ -603,32 +757,34 @@ def display_repository_info(repo_data: Dict[str, Any]):
         st.subheader("💻 Programming Languages")
         fig = create_language_chart(languages)
         if fig:
-            st.plotly_chart(fig, use_container_width=True)
+            show_chart(fig)
     
     # File types breakdown
     file_types = repo_data.get("file_types", {})
     if file_types:
         st.subheader("📄 File Types Distribution")
-        sorted_types = sorted(file_types.items(), key=lambda x: x[1], reverse=True)[:10]
-        
-        # Create a nice display for file types
-        file_type_data = []
-        for ext, count in sorted_types:
-            percentage = (count / sum(file_types.values())) * 100
-            file_type_data.append({
-                'Extension': ext,
-                'Files': count,
-                'Percentage': f"{percentage:.1f}%"
-            })
+        import pandas as pd
         
-        df = pd.DataFrame(file_type_data)
-        st.dataframe(df, use_container_width=True)
+        # Top 10 extensions, with percentages of all files computed column-wise
+        df = pd.DataFrame({'Extension': list(file_types), 'Files': list(file_types.values())})
+        total_files = df['Files'].sum()
+        df = df.nlargest(10, 'Files').reset_index(drop=True)
+        df['Percentage'] = df['Files'] / total_files * 100
+        st.dataframe(df, column_config={'Percentage': st.column_config.NumberColumn(format='%.1f%%')}, **DATAFRAME_OPTIONS)
+
+def generate_json_report(analysis_results: Dict[str, Any]) -> bytes:
+    """Serialize analysis results as indented UTF-8 JSON"""
+    if orjson is not None:
+        return orjson.dumps(analysis_results, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(analysis_results, indent=2).encode()
 
 def generate_downloadable_report(analysis_results: Dict[str, Any], format_type: str) -> str:
     """Generate downloadable report"""
     if format_type.lower() == "json":
-        return json.dumps(analysis_results, indent=2)
+        return generate_json_report(analysis_results).decode()
     elif format_type.lower() == "html":
+        from code_mcp_server import generate_html_report, grade_for_score, summarize_issues
+        
         # Generate summary for HTML report
         repo_info = analysis_results.get("repository_info", {})
         security = analysis_results.get("security_analysis", {})
@@ -640,37 +796,14 @@ def generate_downloadable_report(analysis_results: Dict[str, Any], format_type:
         quality_score = quality.get('quality_score', 0)
         architecture_score = architecture.get('architecture_score', 0)
         
-        # Generate recommendations (this was missing!)
-        recommendations = []
-        
-        # Security recommendations
-        if security_score < 70:
-            recommendations.append("🔒 Address security vulnerabilities and implement security best practices")
-        
-        secrets_found = security.get('secrets_analysis', {}).get('total_secrets', 0)
-        if secrets_found > 0:
-            recommendations.append("🔑 Remove exposed secrets and implement proper secret management")
-        
-        # Quality recommendations
-        if quality_score < 70:
-            recommendations.append("⚡ Improve code quality by fixing linting issues and reducing complexity")
-        
-        test_coverage = quality.get('test_coverage', {}).get('coverage_percentage', 0)
-        if test_coverage < 50:
-            recommendations.append("🧪 Increase test coverage to improve code reliability")
-        
-        # Architecture recommendations
-        if architecture_score < 70:
-            recommendations.append("🏗️ Improve project structure and implement design patterns")
-        
-        if overall_score > 85:
-            recommendations.append("🎉 Excellent work! Your code meets high standards across all areas")
+        # Same recommendations as the dashboard, in their one-line form
+        recommendations = [rec["short"] for rec in recommendations_for(analysis_results) if rec["short"]]
         
         # Create report structure (now includes recommendations)
         report = {
             "executive_summary": {
                 "overall_score": overall_score,
-                "overall_grade": "A" if overall_score > 90 else "B" if overall_score > 80 else "C" if overall_score > 70 else "D" if overall_score > 60 else "F",
+                "overall_grade": grade_for_score(overall_score),
                 "primary_language": repo_info.get("primary_language", "Unknown"),
                 "total_files": len(repo_info.get("file_types", {})),
                 "total_lines": repo_info.get("total_lines_of_code", 0)
@@ -681,9 +814,10 @@ def generate_downloadable_report(analysis_results: Dict[str, Any], format_type:
                 "architecture_score": architecture_score
             },
             "key_findings": {
-                "security_issues": security.get('static_analysis', {}).get('results', []),
-                "quality_issues": quality.get('code_quality', {}).get('pylint_issues', []),
+                "security_issues": summarize_issues(security.get('static_analysis', {}).get('results', []), 'issue_severity'),
+                "quality_issues": summarize_issues(quality.get('code_quality', {}).get('pylint_issues', []), 'type'),
                 "secrets_detected": security.get('secrets_analysis', {}).get('total_secrets', 0),
+                "secrets_scan_truncated": security.get('secrets_analysis', {}).get('scan_truncated', False),
                 "vulnerabilities": security.get('dependency_analysis', {}).get('total_vulnerabilities', 0),
                 "test_coverage": quality.get('test_coverage', {}).get('coverage_percentage', 0),
                 "design_patterns": architecture.get('design_patterns', [])
@@ -699,7 +833,19 @@ def generate_downloadable_report(analysis_results: Dict[str, Any], format_type:
         return generate_html_report(report)
 
 
-def create_download_button(content: str, filename: str, format_type: str):
+def session_report(format_type: str) -> bytes:
+    """Report for the analysis held in session state, generated and encoded once per analysis"""
+    reports = st.session_state.setdefault('reports', {})
+    if format_type not in reports:
+        results = st.session_state['results']
+        # Held as bytes, which st.download_button sends without re-encoding on each rerun
+        if format_type == "json":
+            reports[format_type] = generate_json_report(results)
+        else:
+            reports[format_type] = generate_downloadable_report(results, format_type).encode()
+    return reports[format_type]
+
+def create_download_button(content: Union[str, bytes], filename: str, format_type: str):
     """Create download button for reports"""
     if format_type.lower() == "json":
         mime_type = "application/json"
@@ -715,9 +861,33 @@ def create_download_button(content: str, filename: str, format_type: str):
         mime=mime_type
     )
 
-def main():
-    # Custom CSS
-    st.markdown("""
+# Alert style for each overall grade; D and F fall back to st.error
+GRADE_ALERTS = {"A": st.success, "B": st.success, "C": st.warning}
+
+@st.fragment
+def display_summary_metrics(overall_score: int, security_score: int, quality_score: int):
+    """Display the overall grade and headline scores"""
+    from code_mcp_server import grade_for_score
+    
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        grade = grade_for_score(overall_score)
+        GRADE_ALERTS.get(grade, st.error)(f"Overall Grade: {grade}")
+    
+    with col2:
+        st.metric("Overall Score", f"{overall_score}/100")
+    with col3:
+        st.metric("Security Score", f"{security_score}/100")
+    with col4:
+        st.metric("Quality Score", f"{quality_score}/100")
+
+# Sidebar section toggles (all on by default) and report formats
+SECTION_OPTIONS = ("🔒 Security Analysis", "⚡ Quality Analysis", "🏗️ Architecture Analysis", "💡 Show Recommendations")
+REPORT_FORMATS = ("JSON", "HTML")
+
+# Page styling and header, emitted together as one element
+PAGE_STYLE = """
     <style>
     .main-header {
         text-align: center;
@@ -756,36 +926,39 @@ def main():
         background-color: #f0fff4;
     }
     </style>
-    """, unsafe_allow_html=True)
-    
-    # Header
-    st.markdown("""
+"""
+
+PAGE_HEADER = """
     <div class="main-header">
         <h1>🔍 Advanced Code Analysis Dashboard</h1>
         <p>Comprehensive Security, Quality & Architecture Analysis</p>
     </div>
-    """, unsafe_allow_html=True)
+"""
+
+def main():
+    # Custom CSS and header
+    st.markdown(PAGE_STYLE + PAGE_HEADER, unsafe_allow_html=True)
     
     # Sidebar
     st.sidebar.title("🛠️ Configuration")
-    repo_url = st.sidebar.text_input(
-        "GitHub Repository URL",
-        placeholder="https://github.com/user/repo",
-        help="Enter the full GitHub repository URL"
-    )
+    # Editing the URL only takes effect on submit, so typing it never triggers a rerun
+    with st.sidebar.form("analysis_form", border=False):
+        repo_url = st.text_input(
+            "GitHub Repository URL",
+            placeholder="https://github.com/user/repo",
+            help="Enter the full GitHub repository URL"
+        )
+        analyze_button = st.form_submit_button("🚀 Start Analysis", type="primary")
     
     # Analysis options
     st.sidebar.subheader("📋 Analysis Options")
-    include_security = st.sidebar.checkbox("🔒 Security Analysis", value=True)
-    include_quality = st.sidebar.checkbox("⚡ Quality Analysis", value=True)
-    include_architecture = st.sidebar.checkbox("🏗️ Architecture Analysis", value=True)
-    show_recommendations = st.sidebar.checkbox("💡 Show Recommendations", value=True)
+    include_security, include_quality, include_architecture, show_recommendations = (
+        st.sidebar.checkbox(label, value=True) for label in SECTION_OPTIONS
+    )
     
     # Report format
     st.sidebar.subheader("📄 Report Format")
-    report_format = st.sidebar.selectbox("Choose format", ["JSON", "HTML"])
-    
-    analyze_button = st.sidebar.button("🚀 Start Analysis", type="primary")
+    report_format = st.sidebar.selectbox("Choose format", REPORT_FORMATS)
     
     # Main content
     if analyze_button and repo_url:
@@ -805,98 +978,87 @@ def main():
             progress_bar.progress(100)
             
             if not results.get("success", False):
+                st.session_state.pop('results', None)
                 st.error(f"Analysis failed: {results.get('error', 'Unknown error')}")
                 return
             
             status_text.text("✅ Analysis complete!")
             
-            # Display results
-            if "error" in results:
-                st.error(f"Analysis error: {results['error']}")
-                return
-            
-            # Summary section
-            st.success("🎉 Analysis Complete!")
-            
-            overall_score = results.get("overall_score", 0)
-            security_score = results.get("security_analysis", {}).get("security_score", 0)
-            quality_score = results.get("quality_analysis", {}).get("quality_score", 0)
-            architecture_score = results.get("architecture_analysis", {}).get("architecture_score", 0)
-            
-            # Overall metrics
-            col1, col2, col3, col4 = st.columns(4)
-            
-            with col1:
-                grade = "A" if overall_score > 90 else "B" if overall_score > 80 else "C" if overall_score > 70 else "D" if overall_score > 60 else "F"
-                if grade in ["A", "B"]:
-                    st.success(f"Overall Grade: {grade}")
-                elif grade == "C":
-                    st.warning(f"Overall Grade: {grade}")
-                else:
-                    st.error(f"Overall Grade: {grade}")
-            
-            with col2:
-                st.metric("Overall Score", f"{overall_score}/100")
-            with col3:
-                st.metric("Security Score", f"{security_score}/100")
-            with col4:
-                st.metric("Quality Score", f"{quality_score}/100")
-            
-            # Generate and display download buttons
-            st.subheader("📥 Download Reports")
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                json_report = generate_downloadable_report(results, "json")
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                create_download_button(json_report, f"code_analysis_report_{timestamp}.json", "json")
-            
-            with col2:
-                html_report = generate_downloadable_report(results, "html")
-                create_download_button(html_report, f"code_analysis_report_{timestamp}.html", "html")
-            
-            # Detailed analysis sections
-            st.markdown("---")
-            
-            # Repository info
-            repo_info = results.get("repository_info", {})
-            if repo_info and "error" not in repo_info:
-                display_repository_info(repo_info)
-                st.markdown("---")
-            
-            # Security analysis with detailed findings
-            if include_security:
-                security_analysis = results.get("security_analysis", {})
-                if security_analysis and "error" not in security_analysis:
-                    display_detailed_security_analysis(security_analysis)
-                    st.markdown("---")
-            
-            # Quality analysis with detailed findings
-            if include_quality:
-                quality_analysis = results.get("quality_analysis", {})
-                if quality_analysis and "error" not in quality_analysis:
-                    display_detailed_quality_analysis(quality_analysis)
-                    st.markdown("---")
-            
-            # Architecture analysis
-            if include_architecture:
-                architecture_analysis = results.get("architecture_analysis", {})
-                if architecture_analysis and "error" not in architecture_analysis:
-                    display_architecture_analysis(architecture_analysis)
-                    st.markdown("---")
-            
-            # Comprehensive recommendations
-            if show_recommendations:
-                generate_comprehensive_recommendations(results)
-                st.markdown("---")
-            
-            # Raw data expander
-            with st.expander("📋 Raw Analysis Data"):
-                st.json(results)
+            # Kept across reruns, so widget interactions redisplay results instead of dropping them
+            st.session_state['results'] = results
+            st.session_state['reports'] = {}
+            # Formatted once here, so reruns reuse the same download file names
+            st.session_state['report_stamp'] = datetime.now().strftime("%Y%m%d_%H%M%S")
     
     elif analyze_button:
         st.error("Please enter a repository URL")
     
+    results = st.session_state.get('results')
+    if results:
+        # Display results
+        if "error" in results:
+            st.error(f"Analysis error: {results['error']}")
+            return
+        
+        # Summary section
+        st.success("🎉 Analysis Complete!")
+        
+        # Unpack each section once and share it with the displays below
+        security = results.get("security_analysis") or {}
+        quality = results.get("quality_analysis") or {}
+        architecture = results.get("architecture_analysis") or {}
+        overall_score = results.get("overall_score", 0)
+        security_score = security.get("security_score", 0)
+        quality_score = quality.get("quality_score", 0)
+        
+        # Overall metrics
+        display_summary_metrics(overall_score, security_score, quality_score)
+        
+        # Generate and display download buttons
+        st.subheader("📥 Download Reports")
+        col1, col2 = st.columns(2)
+        
+        with col1:
+            json_report = session_report("json")
+            timestamp = st.session_state['report_stamp']
+            create_download_button(json_report, f"code_analysis_report_{timestamp}.json", "json")
+        
+        with col2:
+            html_report = session_report("html")
+            create_download_button(html_report, f"code_analysis_report_{timestamp}.html", "html")
+        
+        # Detailed analysis sections
+        st.markdown("---")
+        
+        # Repository info; each section reports its own missing or failed data
+        display_repository_info(results.get("repository_info", {}))
+        st.markdown("---")
+        
+        # Security analysis with detailed findings
+        if include_security:
+            display_detailed_security_analysis(security)
+            st.markdown("---")
+        
+        # Quality analysis with detailed findings
+        if include_quality:
+            display_detailed_quality_analysis(quality)
+            st.markdown("---")
+        
+        # Architecture analysis
+        if include_architecture:
+            display_architecture_analysis(architecture)
+            st.markdown("---")
+        
+        # Comprehensive recommendations
+        if show_recommendations:
+            generate_comprehensive_recommendations(results)
+            st.markdown("---")
+        
+        # Raw data expander; the full JSON is only sent to the browser once asked for
+        with st.expander("📋 Raw Analysis Data"):
+            if st.toggle("Load raw data", key="load_raw_data"):
+                st.json(session_report("json").decode())
+    
     # Sidebar information
     st.sidebar.markdown("---")
     st.sidebar.subheader("ℹ️ Enhanced Features")
@@ -6,21 +6,20 @@ Updated for current MCP Python SDK structure
 
 import asyncio
 import logging
-import subprocess
 import sys
+from contextlib import AsyncExitStack
 from dataclasses import dataclass
 from typing import Any, Dict, List, Callable, Awaitable
 
 # Updated imports for current MCP SDK
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
 from mcp import ClientSession
 from mcp.client.stdio import StdioServerParameters, stdio_client
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@dataclass
+@dataclass(frozen=True)
 class ProjectData:
     """Container for a single project."""
     name: str
@@ -34,20 +33,25 @@ class GitHubExtractor:
     @staticmethod
     async def extract_repo_info(github_url: str) -> Dict[str, str]:
         """Extract basic info from a GitHub repository"""
+        fallback = {"context": f"GitHub URL: {github_url}"}
         try:
-            # Extract owner and repo from URL
-            parts = github_url.replace("https://github.com/", "").split("/")
-            if len(parts) >= 2:
-                owner, repo = parts[0], parts[1]
-                return {
-                    "owner": owner,
-                    "repo": repo,
-                    "url": github_url,
-                    "context": f"Repository: {owner}/{repo}"
-                }
+            # Extract owner and repo from URL, splitting no further than the repo segment
+            rest = github_url.removeprefix("https://github.com/").removeprefix("git@github.com:")
+            if rest == github_url:
+                return fallback
+            parts = rest.split("/", 2)
+            if len(parts) < 2 or not parts[0] or not parts[1]:
+                return fallback
+            owner, repo = parts[0], parts[1].removesuffix(".git")
+            return {
+                "owner": owner,
+                "repo": repo,
+                "url": github_url,
+                "context": f"Repository: {owner}/{repo}"
+            }
         except Exception as e:
             logger.error(f"Error extracting GitHub info: {e}")
-            return {"context": f"GitHub URL: {github_url}"}
+            return fallback
 
 class ProjectEvaluationClient:
     """Client for interacting with the Project Evaluation MCP Server"""
@@ -55,18 +59,47 @@ class ProjectEvaluationClient:
     def __init__(self, server_script_path: str = "mcp_server.py"):
         self.server_script_path = server_script_path
         self.github_extractor = GitHubExtractor()
+        self.session = None
+        self._exit_stack = None
 
-    async def _execute_with_server(self, operation: Callable[[ClientSession], Awaitable[Any]]) -> Any:
-        """Execute an operation with the MCP server"""
-        # Create server parameters
-        server_params = StdioServerParameters(
+    def _server_params(self) -> StdioServerParameters:
+        """Build the parameters used to launch the MCP server"""
+        return StdioServerParameters(
             command="python",
             args=[self.server_script_path],
         )
 
+    async def __aenter__(self):
+        """Start the MCP server once and keep its session open for all calls"""
+        self._exit_stack = AsyncExitStack()
+        try:
+            read_stream, write_stream = await self._exit_stack.enter_async_context(
+                stdio_client(self._server_params())
+            )
+            self.session = await self._exit_stack.enter_async_context(
+                ClientSession(read_stream, write_stream)
+            )
+            await self.session.initialize()
+        except Exception:
+            await self.__aexit__(None, None, None)
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        """Close the long-lived session and stop the server"""
+        exit_stack, self._exit_stack, self.session = self._exit_stack, None, None
+        if exit_stack:
+            await exit_stack.aclose()
+
+    async def _execute_with_server(self, operation: Callable[[ClientSession], Awaitable[Any]]) -> Any:
+        """Execute an operation with the MCP server"""
+        # Reuse the open session when the client is used as a context manager
+        if self.session is not None:
+            return await operation(self.session)
+
         try:
             # Connect to server using stdio client
-            async with stdio_client(server_params) as (read_stream, write_stream):
+            async with stdio_client(self._server_params()) as (read_stream, write_stream):
                 # Create client session
                 async with ClientSession(read_stream, write_stream) as session:
                     # Initialize the connection
@@ -117,15 +150,18 @@ class ProjectEvaluationClient:
 
     async def evaluate_multiple_projects(self, projects: List[ProjectData]) -> str:
         """Evaluate multiple projects in batch"""
+        # GitHub lookups are independent per project, so run them concurrently
+        contexts = await asyncio.gather(*(self._augment_context(project) for project in projects))
+        projects_data = [
+            {
+                "name": project.name,
+                "synopsis": project.synopsis,
+                "code_context": code_context
+            }
+            for project, code_context in zip(projects, contexts)
+        ]
+
         async def _op(session: ClientSession):
-            projects_data = []
-            for project in projects:
-                code_context = await self._augment_context(project)
-                projects_data.append({
-                    "name": project.name,
-                    "synopsis": project.synopsis,
-                    "code_context": code_context
-                })
 
             result = await session.call_tool("batch_evaluate", {"projects": projects_data})
             if result.content and len(result.content) > 0:
@@ -176,16 +212,22 @@ class InteractiveCLI:
         print("🚀 Project Innovation & Novelty Evaluator")
         print("=" * 50)
         
-        # Test server connectivity
+        # Start the server once; every menu action reuses the same session
         print("Testing server connection...")
         try:
-            tools = await self.client.list_available_tools()
-            print(f"✅ Connected successfully! Available tools: {', '.join(tools)}")
+            async with self.client:
+                tools = await self.client.list_available_tools()
+                print(f"✅ Connected successfully! Available tools: {', '.join(tools)}")
+                await self._menu_loop()
         except Exception as e:
             print(f"❌ Failed to connect to server: {e}")
             print("Make sure mcp_server.py is available and working.")
             return
 
+        print("👋 Goodbye!")
+
+    async def _menu_loop(self):
+        """Prompt for menu actions until the user exits"""
         while True:
             try:
                 await self._show_menu()
@@ -213,8 +255,6 @@ class InteractiveCLI:
             except Exception as e:
                 print(f"❌ Error: {e}")
 
-        print("👋 Goodbye!")
-
     async def _show_menu(self):
         """Show the main menu"""
         print("\n📋 Menu:")
@@ -355,15 +395,16 @@ async def demo():
         code_context="Smart contracts written in Solidity"
     )
 
-    # Evaluate single project
-    print("Evaluating single project...")
-    result = await client.evaluate_single_project(project1)
-    print(result)
+    async with client:
+        # Evaluate single project
+        print("Evaluating single project...")
+        result = await client.evaluate_single_project(project1)
+        print(result)
 
-    # Compare projects
-    print("\nComparing projects...")
-    comparison = await client.compare_projects(project1, project2)
-    print(comparison)
+        # Compare projects
+        print("\nComparing projects...")
+        comparison = await client.compare_projects(project1, project2)
+        print(comparison)
 
 async def main():
     """Main entry point"""
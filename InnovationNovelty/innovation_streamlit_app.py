@@ -1,9 +1,13 @@
 #!/usr/bin/env python3
 import streamlit as st
-import asyncio
 import sys
 import os
+import re
+from dataclasses import astuple
 
+# async_runner sits at the repository root, above this app's directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from async_runner import enter_async_context, run_coroutine
 from innovation_mcp_client import ProjectEvaluationClient, ProjectData
 
 # Page configuration
@@ -39,22 +43,82 @@ st.markdown("""
 def get_client():
     """Initialize and cache the MCP client"""
     try:
-        return ProjectEvaluationClient()
+        client = ProjectEvaluationClient()
     except Exception as e:
         st.error(f"Failed to initialize client: {e}")
         return None
+    try:
+        # Open on the shared loop, so every session reuses one server until the app exits
+        return enter_async_context(client)
+    except Exception as e:
+        st.warning(f"Could not keep a server session open, connecting per call instead: {e}")
+        return client
 
 def run_async_function(coro):
     """Helper function to run async functions in Streamlit"""
     try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        return loop.run_until_complete(coro)
+        return run_coroutine(coro)
+    except Exception as e:
+        st.error(f"Error running async function: {e}")
+        return None
+
+# The client and server report failures as ordinary text: a whole-run failure starts with one
+# of these, while a batch project or the comparison step can fail inside an otherwise full report
+_FAILED_RESULT_PREFIXES = (
+    "Error",
+    "No evaluation result received",
+    "No comparison result received",
+    "No batch evaluation result received",
+)
+_PARTIAL_FAILURE = re.compile(r"^## .*\nError: |^Error in comparison analysis$", re.MULTILINE)
+
+class PartialEvaluationError(Exception):
+    """Raised for a report that contains failures, so it is shown but not cached"""
+
+    def __init__(self, result: str):
+        super().__init__("Some evaluations in this report failed")
+        self.result = result
+
+def check_evaluation(result: str) -> str:
+    """Return an evaluation report, raising if it reports a failure"""
+    if not result or result.startswith(_FAILED_RESULT_PREFIXES):
+        raise RuntimeError(result or "Empty evaluation result")
+    if _PARTIAL_FAILURE.search(result):
+        raise PartialEvaluationError(result)
+    return result
+
+# Evaluations are cached on the project fields, so resubmitting unchanged projects is instant.
+# They raise on failure rather than returning None, so failed runs are not cached. They run on
+# the shared async_runner loop and read nothing from st.session_state, whose values are per session.
+@st.cache_data(show_spinner=False, ttl=3600)
+def cached_single_evaluation(project: tuple) -> str:
+    """Evaluate a project given as a ProjectData field tuple"""
+    return check_evaluation(run_coroutine(get_client().evaluate_single_project(ProjectData(*project))))
+
+@st.cache_data(show_spinner=False, ttl=3600)
+def cached_comparison(project1: tuple, project2: tuple) -> str:
+    """Compare two projects given as ProjectData field tuples"""
+    return check_evaluation(run_coroutine(
+        get_client().compare_projects(ProjectData(*project1), ProjectData(*project2))
+    ))
+
+@st.cache_data(show_spinner=False, ttl=3600)
+def cached_batch_evaluation(projects: tuple) -> str:
+    """Evaluate a batch of projects given as ProjectData field tuples"""
+    return check_evaluation(run_coroutine(
+        get_client().evaluate_multiple_projects([ProjectData(*project) for project in projects])
+    ))
+
+def run_cached(func, *args):
+    """Call a cached evaluation, reporting errors like run_async_function"""
+    try:
+        return func(*args)
+    except PartialEvaluationError as e:
+        st.warning(f"⚠️ {e}. The results below will not be cached.")
+        return e.result
     except Exception as e:
         st.error(f"Error running async function: {e}")
         return None
-    finally:
-        loop.close()
 
 def main():
     st.title("🚀 Project Innovation & Novelty Evaluator")
@@ -91,13 +155,13 @@ def main():
     
     # Main content based on selection
     if option == "Single Project Evaluation":
-        single_project_evaluation(client)
+        single_project_evaluation()
     elif option == "Project Comparison":
-        project_comparison(client)
+        project_comparison()
     elif option == "Batch Evaluation":
-        batch_evaluation(client)
+        batch_evaluation()
 
-def single_project_evaluation(client):
+def single_project_evaluation():
     """Handle single project evaluation"""
     st.header("📊 Single Project Evaluation")
     st.markdown("Evaluate the innovation and novelty of a single project.")
@@ -163,7 +227,7 @@ def single_project_evaluation(client):
                 )
                 
                 with st.spinner(f"🔄 Evaluating '{name.strip()}'... This may take a few moments."):
-                    result = run_async_function(client.evaluate_single_project(project_data))
+                    result = run_cached(cached_single_evaluation, astuple(project_data))
                     
                     if result:
                         st.session_state.single_evaluation_result = result
@@ -186,7 +250,7 @@ def single_project_evaluation(client):
             mime="text/markdown"
         )
 
-def project_comparison(client):
+def project_comparison():
     """Handle project comparison"""
     st.header("⚖️ Project Comparison")
     st.markdown("Compare the innovation and novelty of two projects side-by-side.")
@@ -230,7 +294,7 @@ def project_comparison(client):
                                      code_context=context2.strip(), github_url=github2.strip())
                 
                 with st.spinner(f"🔄 Comparing '{name1.strip()}' vs '{name2.strip()}'... This may take a few moments."):
-                    result = run_async_function(client.compare_projects(project1, project2))
+                    result = run_cached(cached_comparison, astuple(project1), astuple(project2))
                     
                     if result:
                         st.session_state.comparison_result = result
@@ -254,7 +318,7 @@ def project_comparison(client):
             mime="text/markdown"
         )
 
-def batch_evaluation(client):
+def batch_evaluation():
     """Handle batch evaluation"""
     st.header("📦 Batch Evaluation")
     st.markdown("Evaluate multiple projects at once.")
@@ -265,9 +329,14 @@ def batch_evaluation(client):
     if 'batch_result' not in st.session_state:
         st.session_state.batch_result = None
     
+    batch_workspace()
+
+@st.fragment
+def batch_workspace():
+    """Project list, batch run and results; adding or clearing projects reruns only this part"""
     # Add new project section
     st.subheader("➕ Add Projects")
-    with st.form("add_project_form"):
+    with st.form("add_project_form", clear_on_submit=True):
         col1, col2 = st.columns([3, 1])
         
         with col1:
@@ -302,7 +371,7 @@ def batch_evaluation(client):
                 }
                 st.session_state.batch_projects.append(project)
                 st.success(f"✅ Added '{new_name}' to batch evaluation list!")
-                st.rerun()
+                st.rerun(scope="fragment")
             else:
                 st.error("❌ Project name and synopsis are required!")
         
@@ -310,7 +379,7 @@ def batch_evaluation(client):
             st.session_state.batch_projects = []
             st.session_state.batch_result = None
             st.success("✅ Cleared all projects!")
-            st.rerun()
+            st.rerun(scope="fragment")
     
     # Batch evaluation section
     if st.session_state.batch_projects:
@@ -327,7 +396,7 @@ def batch_evaluation(client):
             ]
             
             with st.spinner(f"🔄 Evaluating {len(projects_data)} projects... This may take several minutes."):
-                result = run_async_function(client.evaluate_multiple_projects(projects_data))
+                result = run_cached(cached_batch_evaluation, tuple(astuple(project) for project in projects_data))
                 
                 if result:
                     st.session_state.batch_result = result
@@ -6,14 +6,26 @@ IP Analysis MCP Client for testing and integration
 import asyncio
 import logging
 from dataclasses import dataclass
-from typing import Any, Dict, List, Callable, Awaitable
+from typing import Any, Dict, List, Callable, Awaitable, Optional
 
+import httpx
 from mcp import ClientSession
 from mcp.client.stdio import StdioServerParameters, stdio_client
 
+try:
+    import uvloop
+except ImportError:  # optional, and unavailable on Windows
+    uvloop = None
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Patentability assessments can take a minute or more on the server
+_API_TIMEOUT = httpx.Timeout(120.0, connect=10.0)
+
+# Requests assess_many and search_prior_art_many keep in flight at once
+_MAX_CONCURRENT_REQUESTS = 4
+
 @dataclass
 class IPAnalysisRequest:
     """Container for IP analysis request data"""
@@ -25,18 +37,93 @@ class IPAnalysisRequest:
 class IPAnalysisClient:
     """Client for interacting with the IP Analysis MCP Server"""
     
-    def __init__(self, server_script_path: str = "ip_mcp_server.py"):
+    def __init__(self, server_script_path: str = "ip_mcp_server.py", api_url: Optional[str] = None):
         self.server_script_path = server_script_path
+        # When set, patentability assessments go to the server's FastAPI /evaluate endpoint instead of stdio
+        self.api_url = api_url
+        # While the client is open, calls share one stdio server, started on first use. HTTP API
+        # requests always share one pooled client. aclose stops and closes both
+        self._open = False
+        self._session: Optional[ClientSession] = None
+        self._session_task: Optional[asyncio.Task] = None
+        self._session_closing: Optional[asyncio.Event] = None
+        self._session_lock: Optional[asyncio.Lock] = None
+        self._http: Optional[httpx.AsyncClient] = None
+        self._http_loop: Optional[asyncio.AbstractEventLoop] = None
     
-    async def _execute_with_server(self, operation: Callable[[ClientSession], Awaitable[Any]]) -> Any:
-        """Execute an operation with the MCP server"""
-        server_params = StdioServerParameters(
+    def _server_params(self) -> StdioServerParameters:
+        """Build the parameters used to launch the MCP server"""
+        return StdioServerParameters(
             command="python",
             args=[self.server_script_path],
         )
-        
+    
+    async def _hold_session(self, ready: asyncio.Future):
+        """Run the MCP server and keep its session open until aclose"""
+        # The stdio client must be exited by the task that entered it, so this task owns the
+        # server rather than whichever call happened to start it
+        try:
+            async with stdio_client(self._server_params()) as (read_stream, write_stream):
+                async with ClientSession(read_stream, write_stream) as session:
+                    await session.initialize()
+                    self._session = session
+                    ready.set_result(session)
+                    await self._session_closing.wait()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                logger.error(f"MCP server session ended: {e}")
+        finally:
+            # Cleared so that the next call starts a new server if this one stopped unexpectedly
+            if self._session_task is asyncio.current_task():
+                self._session, self._session_task = None, None
+    
+    async def _ensure_session(self) -> ClientSession:
+        """Start the MCP server on first use while the client is open, and return its session"""
+        async with self._session_lock:
+            if self._session is None:
+                ready = asyncio.get_running_loop().create_future()
+                self._session_closing = asyncio.Event()
+                self._session_task = asyncio.create_task(self._hold_session(ready))
+                await ready
+            return self._session
+    
+    def _http_client(self) -> httpx.AsyncClient:
+        """Get the pooled HTTP API client, created on first use"""
+        loop = asyncio.get_running_loop()
+        if self._http is None or self._http_loop is not loop:
+            # Pooled connections belong to the loop that opened them, so a new loop needs a new client
+            self._http = httpx.AsyncClient(base_url=self.api_url, timeout=_API_TIMEOUT)
+            self._http_loop = loop
+        return self._http
+    
+    async def aclose(self):
+        """Stop the shared server and close the pooled HTTP client"""
+        self._open = False
+        if self._session_task is not None:
+            self._session_closing.set()
+            await self._session_task
+        http, self._http, self._http_loop = self._http, None, None
+        if http is not None:
+            await http.aclose()
+    
+    async def __aenter__(self):
+        self._session_lock = asyncio.Lock()
+        self._open = True
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.aclose()
+    
+    async def _execute_with_server(self, operation: Callable[[ClientSession], Awaitable[Any]]) -> Any:
+        """Execute an operation with the MCP server"""
+        # Reuse the shared server when the client is open; otherwise connect for this call only
         try:
-            async with stdio_client(server_params) as (read_stream, write_stream):
+            if self._open:
+                return await operation(await self._ensure_session())
+            
+            async with stdio_client(self._server_params()) as (read_stream, write_stream):
                 async with ClientSession(read_stream, write_stream) as session:
                     await session.initialize()
                     return await operation(session)
@@ -44,23 +131,59 @@ class IPAnalysisClient:
             logger.error(f"Error in server operation: {e}")
             raise
     
+    async def _post_to_api(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """POST to the server's HTTP API on the pooled client"""
+        response = await self._http_client().post(path, json=payload)
+        response.raise_for_status()
+        return response.json()
+    
     async def assess_patentability(self, request: IPAnalysisRequest) -> str:
         """Assess patentability of an invention"""
+        arguments = {
+            "invention_description": request.invention_description,
+            "technical_details": request.technical_details,
+            "industry_sector": request.industry_sector,
+            "invention_type": request.invention_type,
+        }
+        
+        if self.api_url:
+            data = await self._post_to_api("/evaluate", arguments)
+            if not data.get("success"):
+                raise RuntimeError(data.get("error") or "Patentability assessment failed")
+            return data["result"]
+        
+        async def _op(session: ClientSession):
+            result = await session.call_tool("assess_patentability", arguments)
+            
+            if result.content and len(result.content) > 0:
+                return result.content[0].text
+            else:
+                return "No patentability assessment received"
+        
+        return await self._execute_with_server(_op)
+    
+    async def bulk_assess(self, requests: List[IPAnalysisRequest]) -> str:
+        """Assess patentability of several inventions with a single tool call"""
         async def _op(session: ClientSession):
             result = await session.call_tool(
-                "assess_patentability",
+                "bulk_assess_patentability",
                 {
-                    "invention_description": request.invention_description,
-                    "technical_details": request.technical_details,
-                    "industry_sector": request.industry_sector,
-                    "invention_type": request.invention_type,
+                    "inventions": [
+                        {
+                            "invention_description": request.invention_description,
+                            "technical_details": request.technical_details,
+                            "industry_sector": request.industry_sector,
+                            "invention_type": request.invention_type,
+                        }
+                        for request in requests
+                    ]
                 }
             )
             
             if result.content and len(result.content) > 0:
                 return result.content[0].text
             else:
-                return "No patentability assessment received"
+                return "No patentability assessments received"
         
         return await self._execute_with_server(_op)
     
@@ -92,6 +215,31 @@ class IPAnalysisClient:
         
         return await self._execute_with_server(_op)
     
+    async def _map_concurrently(self, method_name: str, items: List[Any], **options) -> List[str]:
+        """Call a method once per item on one shared session, a bounded number at a time"""
+        if not self._open:
+            # A closed client would launch a server per call, so open a separate client for the
+            # batch, leaving sessions other callers rely on untouched
+            async with IPAnalysisClient(self.server_script_path, api_url=self.api_url) as client:
+                return await client._map_concurrently(method_name, items, **options)
+        
+        method = getattr(self, method_name)
+        semaphore = asyncio.Semaphore(_MAX_CONCURRENT_REQUESTS)
+        
+        async def _bounded(item):
+            async with semaphore:
+                return await method(item, **options)
+        
+        return list(await asyncio.gather(*(_bounded(item) for item in items)))
+    
+    async def assess_many(self, requests: List[IPAnalysisRequest]) -> List[str]:
+        """Assess patentability of several inventions concurrently, one tool call each"""
+        return await self._map_concurrently("assess_patentability", requests)
+    
+    async def search_prior_art_many(self, search_queries: List[str], **search_options) -> List[str]:
+        """Run several prior art searches concurrently with the same search options"""
+        return await self._map_concurrently("search_prior_art", search_queries, **search_options)
+    
     async def list_available_tools(self) -> List[str]:
         """List available tools from the server"""
         async def _op(session: ClientSession):
@@ -101,10 +249,8 @@ class IPAnalysisClient:
         return await self._execute_with_server(_op)
 
 # Demo and testing functions
-async def demo():
+async def demo(client: IPAnalysisClient):
     """Demo function showing how to use the IP analysis client"""
-    client = IPAnalysisClient()
-    
     # Test patentability assessment
     print("=== Testing Patentability Assessment ===")
     request = IPAnalysisRequest(
@@ -153,18 +299,19 @@ async def main():
     print("🔍 IP Analysis MCP Client Demo")
     print("=" * 50)
     
-    client = IPAnalysisClient()
-    
-    # Test server connectivity
+    # One server process serves the connectivity check and the whole demo
     try:
-        tools = await client.list_available_tools()
-        print(f"✅ Connected! Available tools: {', '.join(tools)}")
+        async with IPAnalysisClient() as client:
+            tools = await client.list_available_tools()
+            print(f"✅ Connected! Available tools: {', '.join(tools)}")
+            
+            # Run demo
+            await demo(client)
     except Exception as e:
         print(f"❌ Failed to connect: {e}")
-        return
-    
-    # Run demo
-    await demo()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if uvloop is not None:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
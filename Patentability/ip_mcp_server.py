@@ -5,8 +5,10 @@ Provides patentability assessment and prior art search capabilities
 """
 
 import asyncio
+import functools
 import json
 import logging
+import string
 from typing import Any, Dict, List, Optional
 import httpx
 from mcp.server.fastmcp import FastMCP
@@ -33,6 +35,82 @@ class IPAnalysisServer:
 # Initialize the IP analysis server
 ip_server = IPAnalysisServer()
 
+# Report templates, filled with string.Template like the code evaluation HTML report
+_PATENTABILITY_REPORT_TEMPLATE = string.Template("""# Patentability Assessment Report
+
+## Executive Summary
+**Overall Patentability Score**: $overall_score/100
+**Recommendation**: $recommendation
+**Confidence Level**: $confidence_level
+
+## Detailed Analysis
+
+### Novelty Assessment (Score: $novelty_score/100)
+$novelty_analysis
+
+### Non-Obviousness Evaluation (Score: $non_obviousness_score/100)
+$non_obviousness_analysis
+
+### Utility Assessment (Score: $utility_score/100)
+$utility_analysis
+
+### Subject Matter Eligibility
+$subject_matter_analysis
+
+## Key Strengths
+$strengths
+
+## Potential Challenges
+$challenges
+
+## Recommendations
+$recommendations
+
+## Next Steps
+$next_steps
+
+---
+*Analysis completed using IP Analysis MCP Server*
+""")
+
+_PRIOR_ART_REPORT_TEMPLATE = string.Template("""# Prior Art Search Results
+
+## Search Summary
+**Query**: "$search_query"
+**Technology Domain**: $technology_domain
+**Search Scope**: $search_scope
+**Total Results Found**: $total_results
+**Databases Searched**: $databases_searched
+
+## High-Relevance Patents ($high_relevance_count)
+$high_relevance_patents
+
+## Medium-Relevance Patents ($medium_relevance_count)
+$medium_relevance_patents
+
+## Academic Literature ($academic_count)
+$academic_papers
+
+## Commercial Products ($commercial_count)
+$commercial_products
+
+## Analysis Summary
+### Patent Landscape Overview
+$landscape_analysis
+
+### Key Findings
+$key_findings
+
+### Novelty Assessment
+$novelty_gaps_identified
+
+### Recommendations
+$recommendations
+
+---
+*Search completed using IP Analysis MCP Server*
+""")
+
 @mcp.tool()
 async def assess_patentability(
     invention_description: str,
@@ -72,42 +150,12 @@ async def assess_patentability(
         result = await ip_server.patentability_analyzer.analyze(analysis_data)
         
         # Format the response
-        response = f"""# Patentability Assessment Report
-
-## Executive Summary
-**Overall Patentability Score**: {result['overall_score']}/100
-**Recommendation**: {result['recommendation']}
-**Confidence Level**: {result['confidence_level']}
-
-## Detailed Analysis
-
-### Novelty Assessment (Score: {result['novelty_score']}/100)
-{result['novelty_analysis']}
-
-### Non-Obviousness Evaluation (Score: {result['non_obviousness_score']}/100)
-{result['non_obviousness_analysis']}
-
-### Utility Assessment (Score: {result['utility_score']}/100)
-{result['utility_analysis']}
-
-### Subject Matter Eligibility
-{result['subject_matter_analysis']}
-
-## Key Strengths
-{format_list(result['strengths'])}
-
-## Potential Challenges
-{format_list(result['challenges'])}
-
-## Recommendations
-{format_list(result['recommendations'])}
-
-## Next Steps
-{result['next_steps']}
-
----
-*Analysis completed using IP Analysis MCP Server*
-"""
+        response = _PATENTABILITY_REPORT_TEMPLATE.substitute({
+            **result,
+            'strengths': format_list(result['strengths']),
+            'challenges': format_list(result['challenges']),
+            'recommendations': format_list(result['recommendations'])
+        })
         
         return response.strip()
         
@@ -115,6 +163,47 @@ async def assess_patentability(
         logger.error(f"Error in patentability assessment: {e}")
         return f"Error analyzing patentability: {str(e)}"
 
+# Inventions accepted per bulk_assess_patentability call, and how many of them are analyzed at once
+_MAX_BULK_INVENTIONS = 20
+_MAX_CONCURRENT_ANALYSES = 4
+
+@mcp.tool()
+async def bulk_assess_patentability(inventions: List[Dict[str, str]]) -> str:
+    """
+    Assess the patentability of several inventions in one call.
+    
+    Args:
+        inventions: List of inventions, each with the assess_patentability fields
+            ("invention_description", and optionally "technical_details",
+            "industry_sector", "invention_type")
+    
+    Returns:
+        One patentability assessment report per invention, in the order given
+    """
+    
+    if not inventions:
+        return "Error: At least one invention is required"
+    if len(inventions) > _MAX_BULK_INVENTIONS:
+        return f"Error: At most {_MAX_BULK_INVENTIONS} inventions can be assessed per call, got {len(inventions)}"
+    
+    # Inventions are independent, so their analyses run concurrently, a few at a time
+    semaphore = asyncio.Semaphore(_MAX_CONCURRENT_ANALYSES)
+    
+    async def _assess(invention: Dict[str, str]) -> str:
+        async with semaphore:
+            return await assess_patentability(
+                invention_description=invention.get("invention_description", ""),
+                technical_details=invention.get("technical_details", ""),
+                industry_sector=invention.get("industry_sector", ""),
+                invention_type=invention.get("invention_type", "software")
+            )
+    
+    reports = await asyncio.gather(*(_assess(invention) for invention in inventions))
+    
+    return "\n\n---\n\n".join(
+        f"# Invention {idx} of {len(reports)}\n\n{report}" for idx, report in enumerate(reports, 1)
+    )
+
 @mcp.tool()
 async def search_prior_art(
     search_query: str,
@@ -156,43 +245,23 @@ async def search_prior_art(
         results = await ip_server.prior_art_searcher.search(search_params)
         
         # Format the response
-        response = f"""# Prior Art Search Results
-
-## Search Summary
-**Query**: "{search_query}"
-**Technology Domain**: {technology_domain or 'General'}
-**Search Scope**: {search_scope}
-**Total Results Found**: {results['total_results']}
-**Databases Searched**: {', '.join(results['databases_searched'])}
-
-## High-Relevance Patents ({len(results['high_relevance_patents'])})
-{format_patent_results(results['high_relevance_patents'])}
-
-## Medium-Relevance Patents ({len(results['medium_relevance_patents'])})
-{format_patent_results(results['medium_relevance_patents'])}
-
-## Academic Literature ({len(results['academic_papers'])})
-{format_literature_results(results['academic_papers'])}
-
-## Commercial Products ({len(results['commercial_products'])})
-{format_product_results(results['commercial_products'])}
-
-## Analysis Summary
-### Patent Landscape Overview
-{results['landscape_analysis']}
-
-### Key Findings
-{format_list(results['key_findings'])}
-
-### Novelty Assessment
-{results['novelty_gaps_identified']}
-
-### Recommendations
-{format_list(results['recommendations'])}
-
----
-*Search completed using IP Analysis MCP Server*
-"""
+        response = _PRIOR_ART_REPORT_TEMPLATE.substitute({
+            **results,
+            'search_query': search_query,
+            'technology_domain': technology_domain or 'General',
+            'search_scope': search_scope,
+            'databases_searched': ', '.join(results['databases_searched']),
+            'high_relevance_count': len(results['high_relevance_patents']),
+            'high_relevance_patents': format_patent_results(results['high_relevance_patents']),
+            'medium_relevance_count': len(results['medium_relevance_patents']),
+            'medium_relevance_patents': format_patent_results(results['medium_relevance_patents']),
+            'academic_count': len(results['academic_papers']),
+            'academic_papers': format_literature_results(results['academic_papers']),
+            'commercial_count': len(results['commercial_products']),
+            'commercial_products': format_product_results(results['commercial_products']),
+            'key_findings': format_list(results['key_findings']),
+            'recommendations': format_list(results['recommendations'])
+        })
         
         return response.strip()
         
@@ -205,62 +274,90 @@ def format_list(items: List[str]) -> str:
     """Format a list of items as markdown bullet points"""
     if not items:
         return "- None identified"
-    return '\n'.join([f"- {item}" for item in items])
+    try:
+        return _format_bullets(tuple(items))
+    except TypeError:  # unhashable items cannot be cached
+        return _format_bullets.__wrapped__(items)
+
+@functools.lru_cache(maxsize=1024)
+def _format_bullets(items: tuple) -> str:
+    """Bullet list for a tuple of items, memoized since the analyzers repeat stock phrases"""
+    return '\n'.join(f"- {item}" for item in items)
+
+# Per-result Markdown templates, filled with string.Template
+_PATENT_TEMPLATE = string.Template("""
+### $title
+- **Patent Number**: $patent_number
+- **Publication Date**: $pub_date
+- **Relevance Score**: $relevance_score/100
+- **Inventor(s)**: $inventors
+- **Abstract**: $abstract...
+- **Key Claims**: $key_claims
+""")
+
+_PAPER_TEMPLATE = string.Template("""
+### $title
+- **Authors**: $authors
+- **Publication**: $journal ($year)
+- **Relevance Score**: $relevance_score/100
+- **Abstract**: $abstract...
+- **DOI**: $doi
+""")
+
+_PRODUCT_TEMPLATE = string.Template("""
+### $name
+- **Company**: $company
+- **Launch Date**: $launch_date
+- **Relevance Score**: $relevance_score/100
+- **Description**: $description...
+- **Key Features**: $key_features
+""")
 
 def format_patent_results(patents: List[Dict]) -> str:
     """Format patent search results"""
     if not patents:
         return "No patents found in this category."
     
-    formatted = []
-    for patent in patents[:10]:  # Limit to top 10
-        formatted.append(f"""
-### {patent['title']}
-- **Patent Number**: {patent['patent_number']}
-- **Publication Date**: {patent['pub_date']}
-- **Relevance Score**: {patent['relevance_score']}/100
-- **Inventor(s)**: {patent['inventors']}
-- **Abstract**: {patent['abstract'][:200]}...
-- **Key Claims**: {patent['key_claims']}
-""")
-    return '\n'.join(formatted)
+    return '\n'.join(
+        _PATENT_TEMPLATE.substitute({**patent, 'abstract': patent['abstract'][:200]})
+        for patent in patents[:10]  # Limit to top 10
+    )
 
 def format_literature_results(papers: List[Dict]) -> str:
     """Format academic literature results"""
     if not papers:
         return "No academic papers found."
     
-    formatted = []
-    for paper in papers[:5]:  # Limit to top 5
-        formatted.append(f"""
-### {paper['title']}
-- **Authors**: {paper['authors']}
-- **Publication**: {paper['journal']} ({paper['year']})
-- **Relevance Score**: {paper['relevance_score']}/100
-- **Abstract**: {paper['abstract'][:150]}...
-- **DOI**: {paper.get('doi', 'N/A')}
-""")
-    return '\n'.join(formatted)
+    return '\n'.join(
+        _PAPER_TEMPLATE.substitute({**paper, 'abstract': paper['abstract'][:150], 'doi': paper.get('doi', 'N/A')})
+        for paper in papers[:5]  # Limit to top 5
+    )
 
 def format_product_results(products: List[Dict]) -> str:
     """Format commercial product results"""
     if not products:
         return "No commercial products identified."
     
-    formatted = []
-    for product in products[:5]:
-        formatted.append(f"""
-### {product['name']}
-- **Company**: {product['company']}
-- **Launch Date**: {product.get('launch_date', 'Unknown')}
-- **Relevance Score**: {product['relevance_score']}/100
-- **Description**: {product['description'][:150]}...
-- **Key Features**: {', '.join(product.get('key_features', []))}
-""")
-    return '\n'.join(formatted)
-
-from fastapi import FastAPI, Request
+    return '\n'.join(
+        _PRODUCT_TEMPLATE.substitute({
+            **product,
+            'launch_date': product.get('launch_date', 'Unknown'),
+            'description': product['description'][:150],
+            'key_features': ', '.join(product.get('key_features', []))
+        })
+        for product in products[:5]
+    )
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
 import uvicorn
+
+try:
+    import orjson  # noqa: F401 - ORJSONResponse needs it
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+except ImportError:
+    DefaultResponse = JSONResponse
 from ip_mcp_server import (  # or correct import for your analysis function
     assess_patentability,
     search_prior_art
@@ -269,23 +366,30 @@ from ip_mcp_server import (  # or correct import for your analysis function
 if __name__ == "__main__":
     mcp.run() 
     
-app = FastAPI()
+app = FastAPI(default_response_class=DefaultResponse)
 
-@app.post("/evaluate")
-async def evaluate(request: Request):
-    data = await request.json()
+class EvaluationRequest(BaseModel):
+    """Body of a /evaluate request, with the assess_patentability defaults"""
+    invention_description: str = ""
+    technical_details: str = ""
+    industry_sector: str = ""
+    invention_type: str = "software"
 
+@app.post("/evaluate")
+async def evaluate(request: EvaluationRequest):
     try:
         result = await assess_patentability(
-            invention_description=data.get("invention_description", ""),
-            technical_details=data.get("technical_details", ""),
-            industry_sector=data.get("industry_sector", ""),
-            invention_type=data.get("invention_type", "software")
+            invention_description=request.invention_description,
+            technical_details=request.technical_details,
+            industry_sector=request.industry_sector,
+            invention_type=request.invention_type
         )
         return {"success": True, "result": result, "error": None}
     except Exception as e:
         return {"success": False, "result": None, "error": str(e)}
 
+# Never reached when run as a script, since mcp.run() above serves stdio until exit.
+# Serve the HTTP API with: uvicorn ip_mcp_server:app --port 7901
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=7901)
 
@@ -5,11 +5,14 @@ Provides a user-friendly interface for patentability assessment and prior art se
 """
 
 import streamlit as st
-import asyncio
 import sys
 import os
 
 from datetime import datetime
+
+# async_runner sits at the repository root, above this app's directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from async_runner import enter_async_context, run_coroutine
 from ip_mcp_client import IPAnalysisClient, IPAnalysisRequest
 
 # Page configuration
@@ -66,23 +69,27 @@ st.markdown("""
 def get_ip_client():
     """Initialize and cache the IP Analysis MCP client"""
     try:
-        # Adjust the path to your IP MCP server
-        return IPAnalysisClient("ip_mcp_server.py")
+        # Adjust the path to your IP MCP server. Setting IP_ANALYSIS_API_URL (e.g. http://localhost:7901,
+        # served with `uvicorn ip_mcp_server:app --port 7901`) sends patentability assessments to its
+        # FastAPI endpoint instead of the stdio server
+        client = IPAnalysisClient("ip_mcp_server.py", api_url=os.environ.get("IP_ANALYSIS_API_URL"))
     except Exception as e:
         st.error(f"Failed to initialize IP client: {e}")
         return None
+    try:
+        # Open on the shared loop, so every session reuses one server until the app exits
+        return enter_async_context(client)
+    except Exception as e:
+        st.warning(f"Could not keep a server session open, connecting per call instead: {e}")
+        return client
 
 def run_async_function(coro):
     """Helper function to run async functions in Streamlit"""
     try:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        return loop.run_until_complete(coro)
+        return run_coroutine(coro)
     except Exception as e:
         st.error(f"Error running async function: {e}")
         return None
-    finally:
-        loop.close()
 
 def display_server_status():
     """Display server connection status"""
@@ -436,6 +443,7 @@ def comprehensive_analysis_section():
                 # Progress tracking
                 progress_bar = st.progress(0)
                 status_text = st.empty()
+                preview = st.empty()
                 
                 try:
                     # Step 1: Patentability Assessment
@@ -456,6 +464,12 @@ def comprehensive_analysis_section():
                         st.error("❌ Failed to complete patentability assessment.")
                         return
                     
+                    # Show the assessment while the prior art search runs, rather than only once both finish
+                    with preview.container():
+                        with st.expander("📋 Patentability Assessment (prior art search in progress)", expanded=True):
+                            st.markdown(f'<div class="analysis-result">{patent_result}</div>', 
+                                       unsafe_allow_html=True)
+                    
                     # Step 2: Prior Art Search
                     status_text.text("🔄 Step 2/2: Searching for prior art...")
                     progress_bar.progress(75)
@@ -505,6 +519,7 @@ def comprehensive_analysis_section():
                 finally:
                     progress_bar.empty()
                     status_text.empty()
+                    preview.empty()
     
     # Display results
     if st.session_state.comprehensive_result:
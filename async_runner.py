@@ -0,0 +1,74 @@
+"""Run coroutines from Streamlit script threads on one shared background event loop"""
+import asyncio
+import atexit
+import threading
+
+try:
+    import uvloop
+except ImportError:  # optional, and unavailable on Windows
+    uvloop = None
+
+_loop = None
+_loop_lock = threading.Lock()
+
+def _serve(loop):
+    # Only this thread drives the loop, so concurrent sessions can submit to it safely.
+    # It is also the loop's current loop, which child-process transports rely on.
+    asyncio.set_event_loop(loop)
+    loop.run_forever()
+
+def _shutdown(loop, thread):
+    """Stop the loop at interpreter exit, cancelling what is still running, and close it"""
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    pending = asyncio.all_tasks(loop)
+    if pending:
+        for task in pending:
+            task.cancel()
+        loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+    loop.run_until_complete(loop.shutdown_asyncgens())
+    loop.close()
+
+def get_event_loop():
+    """Get the process-wide event loop, starting its thread on first use"""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = uvloop.new_event_loop() if uvloop else asyncio.new_event_loop()
+            thread = threading.Thread(target=_serve, args=(loop,), name="async-runner", daemon=True)
+            thread.start()
+            atexit.register(_shutdown, loop, thread)
+            _loop = loop
+        return _loop
+
+def run_coroutine(coro):
+    """Run a coroutine on the shared loop and block the calling thread until it finishes"""
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop()).result()
+
+async def _hold(manager, entered, exiting):
+    """Keep an async context manager entered until exiting is set"""
+    # Entered and exited in this one task, as anyio-based managers like the MCP stdio client require
+    try:
+        async with manager as value:
+            entered.set_result(value)
+            await exiting.wait()
+    except Exception as e:
+        if entered.done():
+            raise
+        entered.set_exception(e)
+
+async def _enter(manager):
+    entered, exiting = asyncio.get_running_loop().create_future(), asyncio.Event()
+    task = asyncio.create_task(_hold(manager, entered, exiting))
+    return await entered, exiting, task
+
+async def _exit(exiting, task):
+    exiting.set()
+    await task
+
+def enter_async_context(manager):
+    """Enter an async context manager on the shared loop and keep it open until interpreter exit"""
+    value, exiting, task = run_coroutine(_enter(manager))
+    # Registered after the loop's own shutdown hook, so it runs first, while the loop is still up
+    atexit.register(lambda: run_coroutine(_exit(exiting, task)))
+    return value